@@ -1,63 +1,277 @@
-from wiki_dump_extractor import WikiDumpExtractor, page_utils
+from wiki_dump_extractor import WikiXmlDumpExtractor, page_utils, date_utils
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from multiprocessing import Pool
+from multiprocessing.util import Finalize
 from pathlib import Path
-from tqdm import tqdm
+import os
 import pandas
+import pyarrow
+import pyarrow.parquet
 
+_DATE_TYPE = pyarrow.struct(
+    [
+        (
+            "date",
+            pyarrow.struct(
+                [
+                    ("year", pyarrow.int64()),
+                    ("month", pyarrow.int64()),
+                    ("day", pyarrow.int64()),
+                    ("is_approximate", pyarrow.bool_()),
+                ]
+            ),
+        ),
+        ("format", pyarrow.string()),
+        ("date_str", pyarrow.string()),
+    ]
+)
+
+# Explicit schema, so that all the parquet files have the same column types
+# even when a column is empty in a batch. The columns go from the smallest
+# (fixed-width) to the largest, so that readers of the small columns fetch
+# them in few contiguous reads.
+PARQUET_SCHEMA = pyarrow.schema(
+    [
+        ("page_id", pyarrow.int64()),
+        ("has_date", pyarrow.bool_()),
+        ("longitude", pyarrow.float64()),
+        ("latitude", pyarrow.float64()),
+        ("timestamp", pyarrow.timestamp("s")),
+        ("infobox_category", pyarrow.string()),
+        ("revision_id", pyarrow.string()),
+        ("title", pyarrow.string()),
+        ("redirect_title", pyarrow.string()),
+        ("categories", pyarrow.list_(pyarrow.string())),
+        ("dates", pyarrow.list_(_DATE_TYPE)),
+        ("text", pyarrow.string()),
+    ]
+)
+
+
+def _extract_where(
+    texts: pandas.Series, pattern: str, extractor, default=None, excluded=None
+):
+    """Run the extractor on the texts matching the pattern, else return default.
+
+    The pattern search runs on the whole batch at once (with the pyarrow string
+    kernels, for texts of dtype "string[pyarrow]"), so the slower extractor
+    only runs on the pages that need it.
+    Texts flagged in the boolean array `excluded` are skipped too.
+    """
+    selected = texts.str.contains(pattern, regex=True).to_numpy()
+    if excluded is not None:
+        selected = selected & ~excluded
+    return [
+        extractor(text) if is_selected else default
+        for text, is_selected in zip(texts, selected)
+    ]
+
+
+def extract_infos_batch(texts: pandas.Series) -> dict:
+    """Extract the dates, categories, infobox category and coordinates of pages.
 
-def extract_infos(page_text: str) -> dict:
-    infos = {
-        "dates": page_utils.extract_dates(page_text),  # slow!
-        "has_date": page_utils.has_date(page_text),
-        "categories": page_utils.extract_categories(page_text),
-        "infobox_category": page_utils.extract_infobox_category(page_text),
+    The infos are extracted for a whole batch of pages, column by column.
+    Redirect pages are only searched for categories, as they have no content
+    of their own. Returns a dict {column_name: list of values, one per text}.
+    """
+
+    def extract_dates(text):
+        dates = date_utils.extract_dates(text)
+        # Tuples (in the order of _DATE_TYPE's fields) are faster to build and
+        # to convert to pyarrow than dicts.
+        return [date.to_tuple() for date in dates]
+
+    # Redirects have no content of their own, only (sometimes) categories.
+    redirects = texts.str.match(r"\s*#REDIRECT", case=False).to_numpy()
+    dates = _extract_where(texts, r"[0-9]", extract_dates, [], redirects)
+    coordinates = _extract_where(
+        texts,
+        r"(?i)\{\{coord|latitude|longitude",
+        page_utils.extract_geospatial_coordinates,
+        excluded=redirects,
+    )
+    return {
+        "dates": dates,
+        "has_date": [bool(page_dates) for page_dates in dates],
+        "categories": _extract_where(
+            texts, r"(?i)\[\[Category:", page_utils.extract_categories, []
+        ),
+        "infobox_category": _extract_where(
+            texts,
+            r"\{\{Infobox",
+            page_utils.extract_infobox_category,
+            excluded=redirects,
+        ),
+        "longitude": [c[1] if c else None for c in coordinates],
+        "latitude": [c[0] if c else None for c in coordinates],
     }
-    coordinates = page_utils.extract_geospatial_coordinates(page_text)
-    if coordinates:
-        infos["longitude"], infos["latitude"] = coordinates
-    return infos
 
 
-def save_batch_to_parquet(batch_and_path):
-    batch, target_path = batch_and_path
-    records = [{**page.to_dict(), **extract_infos(page.text)} for page in batch]
-    df = pandas.DataFrame(records).set_index("page_id")
-    df.to_parquet(target_path)
-    return df
+PAGE_FIELDS = ["page_id", "title", "timestamp", "redirect_title", "revision_id", "text"]
+
+
+def batch_to_columns(batch) -> dict:
+    """Return the fields of a batch of pages as a dict {field: list of values}.
+
+    Plain lists of strings and ints are much cheaper to send to worker
+    processes than lists of Page objects.
+    """
+    return {field: [getattr(page, field) for page in batch] for field in PAGE_FIELDS}
+
+
+class ParquetShardWriter:
+    """Write tables as the row groups of a few large parquet files.
+
+    A new file is started every `batches_per_file` tables, which gives files
+    that are much faster to read than one small file per batch.
 
+    The tables are compressed and written in a background thread (pyarrow
+    releases the GIL meanwhile), so that the next batch can be processed at
+    the same time. At most `max_pending_writes` tables wait to be written.
+    The writer can't be used after `close()`.
+    """
 
-def file_path_iterator(output_dir):
-    output_dir = Path(output_dir)
-    output_dir.mkdir(parents=True, exist_ok=True)
-    for i in range(1000_000):
-        yield output_dir / f"batch_{i:06d}.parquet"
+    def __init__(
+        self, output_dir, prefix="shard", batches_per_file=100, max_pending_writes=2
+    ):
+        self.output_dir = Path(output_dir)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.prefix = prefix
+        self.batches_per_file = batches_per_file
+        self.max_pending_writes = max_pending_writes
+        self.n_files = 0
+        self.n_batches_in_file = 0
+        self._writer = None
+        # A single thread, as the parquet writer isn't thread-safe.
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._pending_writes = deque()
+
+    def write(self, table):
+        self._pending_writes.append(self._executor.submit(self._write_table, table))
+        while len(self._pending_writes) > self.max_pending_writes:
+            self._pending_writes.popleft().result()
+
+    def _write_table(self, table):
+        if self._writer is None:
+            target_path = self.output_dir / f"{self.prefix}_{self.n_files:06d}.parquet"
+            self._writer = pyarrow.parquet.ParquetWriter(
+                target_path,
+                PARQUET_SCHEMA,
+                compression="zstd",
+                use_dictionary=True,
+                write_statistics=True,
+                data_page_size=1 << 20,
+            )
+            self.n_files += 1
+        self._writer.write_table(table, row_group_size=table.num_rows)
+        self.n_batches_in_file += 1
+        if self.n_batches_in_file == self.batches_per_file:
+            self._close_file()
+
+    def _close_file(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+            self.n_batches_in_file = 0
+
+    def close(self):
+        while self._pending_writes:
+            self._pending_writes.popleft().result()
+        self._executor.shutdown()
+        self._close_file()
+
+
+def save_batch_to_parquet(page_columns, writer):
+    # The table is built column by column (no intermediate dict per page), and
+    # repetitive columns like categories get dictionary-encoded by parquet.
+    columns = {
+        **page_columns,
+        **extract_infos_batch(
+            pandas.Series(page_columns["text"], dtype="string[pyarrow]")
+        ),
+    }
+    table = pyarrow.Table.from_pydict(columns, schema=PARQUET_SCHEMA)
+    writer.write(table)
+    # Only return the number of rows, so that the whole table (with the page
+    # texts) isn't sent back from the worker processes.
+    return table.num_rows
+
+
+def _page_limit(batch_size, max_batches):
+    return None if max_batches is None else batch_size * max_batches
 
 
 def extract_pages_to_parquet_sequential(
-    dump_file, output_dir, batch_size=1000, max_batches=None
+    dump_file, output_dir, batch_size=1000, max_batches=None, batches_per_file=100
 ):
-    extractor = WikiDumpExtractor(file_path=dump_file)
-    batches = extractor.iter_page_batches(batch_size=batch_size, limit=max_batches)
-    for batch_and_filepath in zip(batches, file_path_iterator(output_dir)):
-        save_batch_to_parquet(batch_and_filepath)
+    extractor = WikiXmlDumpExtractor(file_path=dump_file)
+    batches = extractor.iter_page_batches(
+        batch_size=batch_size, page_limit=_page_limit(batch_size, max_batches)
+    )
+    writer = ParquetShardWriter(output_dir, batches_per_file=batches_per_file)
+    try:
+        for batch in batches:
+            save_batch_to_parquet(batch_to_columns(batch), writer)
+    finally:
+        writer.close()
+
+
+# Each worker process writes to its own files, with this writer.
+_worker_writer = None
+
+
+def _init_worker(output_dir, batches_per_file):
+    global _worker_writer
+    _worker_writer = ParquetShardWriter(
+        output_dir,
+        prefix=f"shard_{os.getpid()}",
+        batches_per_file=batches_per_file,
+    )
+    # Closes the last file of the worker when it exits (after pool.close()).
+    Finalize(_worker_writer, _worker_writer.close, exitpriority=10)
+
+
+def _save_batch_in_worker(page_columns):
+    return save_batch_to_parquet(page_columns, _worker_writer)
 
 
 def extract_pages_to_parquet_parallel(
-    dump_file, output_dir, batch_size=1000, n_workers=7, max_batches=None
+    dump_file,
+    output_dir,
+    batch_size=1000,
+    n_workers=7,
+    max_batches=None,
+    chunksize=4,
+    batches_per_file=100,
 ):
-    extractor = WikiDumpExtractor(file_path=dump_file)
-    iterator = extractor.iter_page_batches(batch_size=batch_size, limit=max_batches)
-    batches_and_paths = zip(iterator, file_path_iterator(output_dir))
-    with Pool(processes=n_workers) as pool:
-        pooled_jobs = pool.imap_unordered(save_batch_to_parquet, batches_and_paths)
+    extractor = WikiXmlDumpExtractor(file_path=dump_file)
+    iterator = extractor.iter_page_batches(
+        batch_size=batch_size, page_limit=_page_limit(batch_size, max_batches)
+    )
+    columns = map(batch_to_columns, iterator)
+    with Pool(
+        processes=n_workers,
+        initializer=_init_worker,
+        initargs=(output_dir, batches_per_file),
+    ) as pool:
+        # Sending several batches per task means fewer round-trips to the workers.
+        pooled_jobs = pool.imap_unordered(
+            _save_batch_in_worker, columns, chunksize=chunksize
+        )
         for batch_result in pooled_jobs:
             # here we could also be yielding the results of the batch
             pass
+        # Let the workers exit normally so that they close their files (leaving
+        # the `with` block would terminate them).
+        pool.close()
+        pool.join()
 
 
-extract_pages_to_parquet_parallel(
-    dump_file="tiny_dump.xml.bz2",
-    output_dir="info_parquets/",
-    batch_size=10,
-    max_batches=5,
-)
+if __name__ == "__main__":
+    extract_pages_to_parquet_parallel(
+        dump_file="tiny_dump.xml.bz2",
+        output_dir="info_parquets/",
+        batch_size=10,
+        max_batches=5,
+    )
@@ -1,8 +1,22 @@
 import re
-from datetime import datetime
-from typing import List, Dict, ClassVar, Pattern, Optional
+from typing import List, Dict, ClassVar, Iterable, Iterator, Pattern, Optional, Tuple
 from abc import ABC, abstractmethod
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass
+
+
+def _days_in_month(year: int, month: int) -> int:
+    """Return the number of days of a month (1-12) in a given year."""
+    if month in (4, 6, 9, 11):  # April, June, September, November
+        return 30
+    if month == 2:  # February, check for leap year
+        if (year % 4 == 0 and year % 100 != 0) or (year % 400 == 0):
+            return 29
+        return 28
+    return 31
+
+
+def _is_valid_day(year: int, month: int, day: int) -> bool:
+    return 1 <= month <= 12 and 1 <= day <= _days_in_month(year, month)
 
 
 @dataclass(slots=True)
@@ -25,17 +39,7 @@ class Date:
             return True
 
         # Validate day based on month and year
-        max_days = 31  # Default for most months
-
-        if self.month in [4, 6, 9, 11]:  # April, June, September, November
-            max_days = 30
-        elif self.month == 2:  # February
-            # Check for leap year
-            if (self.year % 4 == 0 and self.year % 100 != 0) or (self.year % 400 == 0):
-                max_days = 29
-            else:
-                max_days = 28
-
+        max_days = _days_in_month(self.year, self.month)
         if not 1 <= self.day <= max_days:
             raise ValueError(
                 f"Day must be between 1 and {max_days} for month {self.month}, got {self.day}"
@@ -53,7 +57,22 @@ class Date:
         return result
 
     def to_dict(self) -> Dict:
-        return asdict(self)
+        # Built by hand, as dataclasses.asdict (which deep-copies every field)
+        # is the slowest step of exporting the dates of a page.
+        return {
+            "year": self.year,
+            "month": self.month,
+            "day": self.day,
+            "is_approximate": self.is_approximate,
+        }
+
+    def to_tuple(self) -> Tuple:
+        """Return (year, month, day, is_approximate).
+
+        Tuples are lighter than dicts and pyarrow accepts them for struct
+        columns, in the order of the fields.
+        """
+        return (self.year, self.month, self.day, self.is_approximate)
 
 
 # Define month name to number mapping
@@ -83,6 +102,14 @@ _MONTH_MAP = {
     "dec": 12,
 }
 
+# Same mapping with the usual capitalizations of the month names ("march",
+# "March", "MARCH") so that matched month names can be looked up directly.
+_MONTH_MAP_CASED = {
+    cased: number
+    for name, number in _MONTH_MAP.items()
+    for cased in (name, name.capitalize(), name.upper())
+}
+
 # Dictionary to convert written numbers to integers
 _WRITTEN_NUMBERS = {
     "first": 1,
@@ -118,6 +145,10 @@ _WRITTEN_NUMBERS = {
     "thirty-first": 31,
 }
 
+# The date patterns are all ASCII (digits, English month names), so re.ASCII
+# saves the regex engine the Unicode case folding and character classes.
+_DATE_FLAGS = re.IGNORECASE | re.ASCII
+
 # Common month pattern for reuse
 _MONTHS_PATTERN = (
     "January|February|March|April|May|June|July|August|September|October|November|December|"
@@ -138,6 +169,10 @@ class DetectedDate:
             "date_str": self.date_str,
         }
 
+    def to_tuple(self) -> Tuple:
+        """Return (date tuple, format, date_str), in the order of to_dict."""
+        return (self.date.to_tuple(), self.format, self.date_str)
+
 
 class DateFormat(ABC):
     """Base class for all date format detectors."""
@@ -147,26 +182,32 @@ class DateFormat(ABC):
 
     @classmethod
     @abstractmethod
-    def match_to_date(cls, match: re.Match) -> datetime:
-        """Convert a regex match to a datetime object.
+    def groups_to_date(cls, groups: tuple, match: re.Match) -> Optional[Date]:
+        """Convert the groups of a regex match to a Date object.
 
         Parameters
         ----------
+        groups : tuple
+            The groups captured by the format's pattern. When the match comes
+            from the combined pattern used in ``extract_dates``, these are only
+            the groups of this format's sub-pattern.
         match : re.Match
             The regex match object containing the date information
 
         Returns
         -------
-        datetime
-            The parsed datetime object
-
-        Raises
-        ------
-        ValueError
-            If the match cannot be converted to a valid datetime
+        Date | None
+            The parsed date, or None if the match is not a valid date. Invalid
+            matches (like "31 February 2000") are common in large texts, so
+            they return None rather than raising an exception.
         """
         pass
 
+    @classmethod
+    def match_to_date(cls, match: re.Match) -> Optional[Date]:
+        """Convert a match of the format's pattern to a Date object."""
+        return cls.groups_to_date(match.groups(), match)
+
     @classmethod
     def convert_month_to_number(cls, month_name: str) -> int:
         """Convert month name to its numerical representation.
@@ -176,30 +217,30 @@ class DateFormat(ABC):
         ValueError
             If the month name is not recognized
         """
-        month = _MONTH_MAP.get(month_name.lower())
+        month = _MONTH_MAP_CASED.get(month_name)
+        if month is None:
+            month = _MONTH_MAP.get(month_name.lower())
         if month is None:
             raise ValueError(f"Unknown month name: {month_name}")
         return month
 
     @classmethod
-    def list_dates(cls, text: str) -> bool:
-        """Check if the text contains any dates detected by regex patterns."""
+    def list_dates(cls, text: str) -> List[DetectedDate]:
+        """Return the dates of this format found in the text."""
         results = []
-        errors = []
         for match in cls.pattern.finditer(text):
-            try:
-                date = cls.match_to_date(match)
-                if date is not None:
-                    detected_date = DetectedDate(
-                        date_str=match.group(0), format=cls.name, date=date
-                    )
-                    results.append(detected_date)
+            detected_date = cls._detect(match.groups(), match)
+            if detected_date is not None:
+                results.append(detected_date)
+        return results
 
-            except ValueError as err:
-                errors.append(
-                    f"Error parsing {cls.name} date: {match.group(0)} - {err}"
-                )
-        return results, errors
+    @classmethod
+    def _detect(cls, groups: tuple, match: re.Match) -> Optional[DetectedDate]:
+        """Return the detected date of a match of this format, if valid."""
+        date = cls.groups_to_date(groups, match)
+        if date is None:
+            return None
+        return DetectedDate(date_str=match.group(0), format=cls.name, date=date)
 
 
 class SlashDMYMDYFormat(DateFormat):
@@ -207,25 +248,23 @@ class SlashDMYMDYFormat(DateFormat):
 
     name = "SLASH_DMY_MDY"
     pattern = re.compile(
-        r"\B[^|](\d{1,2})[-/](\d{1,2})[-/](\d{1,4})(?:\s+(BC|BCE))?\b", re.IGNORECASE
+        r"\B[^|](\d{1,2})[-/](\d{1,2})[-/](\d{1,4})(?:\s+(BC|BCE))?\b", _DATE_FLAGS
     )
 
     @classmethod
-    def match_to_date(cls, match: re.Match) -> Date:
-        day, month, year, bc = match.groups()
-        day, month, year = int(day), int(month), int(year)
+    def groups_to_date(cls, groups: tuple, match: re.Match) -> Date:
+        first, second, year, bc = groups
+        first, second, year = int(first), int(second), int(year)
         if bc:
             year = -year
 
-        # Try MM/DD/YYYY first (American format)
-        try:
-            return Date(year, month, day)
-        except (ValueError, IndexError):
-            # Try DD/MM/YYYY (European format)
-            try:
-                return Date(year, day, month)
-            except (ValueError, IndexError):
-                return None
+        # Try DD/MM/YYYY first (European format)
+        if 1 <= second <= 12 and 1 <= first <= _days_in_month(year, second):
+            return Date(year, second, first)
+        # Then MM/DD/YYYY (American format)
+        if 1 <= first <= 12 and 1 <= second <= _days_in_month(year, first):
+            return Date(year, first, second)
+        return None
 
 
 class DashYMDFormat(DateFormat):
@@ -233,68 +272,69 @@ class DashYMDFormat(DateFormat):
 
     name = "DASH_YMD"
     pattern = re.compile(
-        r"\b(\d{1,4})[-/](\d{1,2})[-/](\d{1,2})(?:\s+(BC|BCE))?\b", re.IGNORECASE
+        r"\b(\d{1,4})[-/](\d{1,2})[-/](\d{1,2})(?:\s+(BC|BCE))?\b", _DATE_FLAGS
     )
 
     @classmethod
-    def match_to_date(cls, match: re.Match) -> Date:
-        groups = match.groups()
+    def groups_to_date(cls, groups: tuple, match: re.Match) -> Date:
         year, month, day, bc = groups
+        year, month, day = int(year), int(month), int(day)
         if bc:
-            year = -int(year)
-        return Date(int(year), int(month), int(day))
+            year = -year
+        if not _is_valid_day(year, month, day):
+            return None
+        return Date(year, month, day)
 
 
 class DayMonthYearFormat(DateFormat):
     """Format for DD Month YYYY dates."""
 
     name = "DAY_MONTH_YEAR"
-    re_dmy = rf"""\b
-        (\d{{1,2}})                          # Day (1-2 digits)
-        \s+
-        ({_MONTHS_PATTERN})               # Month (provided externally)
-        [,\s]+
-        (?:AD\s*)?
-        (\d{{1,4}})                         # Year (1-4 digits)
-        (?:\s+(BC|BCE))?                    # Optional ' BC'
-        \b
-    """
-    pattern = re.compile(re_dmy, re.VERBOSE | re.IGNORECASE)
+    re_dmy = (
+        r"\b(\d{1,2})"  # Day (1-2 digits)
+        rf"\s+({_MONTHS_PATTERN})"  # Month
+        r"[,\s]+(?:AD\s*)?"
+        r"(\d{1,4})"  # Year (1-4 digits)
+        r"(?:\s+(BC|BCE))?\b"  # Optional ' BC'
+    )
+    pattern = re.compile(re_dmy, _DATE_FLAGS)
 
     @classmethod
-    def match_to_date(cls, match: re.Match) -> Date:
-        day, month_str, year, bc = match.groups()
+    def groups_to_date(cls, groups: tuple, match: re.Match) -> Date:
+        day, month_str, year, bc = groups
         month = cls.convert_month_to_number(month_str)
+        year, day = int(year), int(day)
         if bc:
-            year = -int(year)
-        return Date(int(year), month, int(day))
+            year = -year
+        if not _is_valid_day(year, month, day):
+            return None
+        return Date(year, month, day)
 
 
 class MonthDayYearFormat(DateFormat):
     """Format for Month DD YYYY dates."""
 
     name = "MONTH_DAY_YEAR"
-    re_mdy = rf"""
-        \b
-        ({_MONTHS_PATTERN})        # Month name
-        \s+
-        (\d{{1,2}})                # Day (1 or 2 digits)
-        (?:st|nd|rd|th)?           # Optional ordinal suffix
-        [,\s]+
-        (?:AD\s*)?
-        (\d{{1,4}})                # Year (1 to 4 digits)
-        (?:\s+(BC|BCE))?           # Optional ' BC'
-        \b
-    """
-    pattern = re.compile(re_mdy, re.VERBOSE | re.IGNORECASE)
+    re_mdy = (
+        rf"\b({_MONTHS_PATTERN})"  # Month name
+        r"\s+(\d{1,2})"  # Day (1 or 2 digits)
+        r"(?:st|nd|rd|th)?"  # Optional ordinal suffix
+        r"[,\s]+(?:AD\s*)?"
+        r"(\d{1,4})"  # Year (1 to 4 digits)
+        r"(?:\s+(BC|BCE))?\b"  # Optional ' BC'
+    )
+    pattern = re.compile(re_mdy, _DATE_FLAGS)
 
     @classmethod
-    def match_to_date(cls, match: re.Match) -> Date:
-        month_str, day, year, bc = match.groups()
+    def groups_to_date(cls, groups: tuple, match: re.Match) -> Date:
+        month_str, day, year, bc = groups
         month = cls.convert_month_to_number(month_str)
+        year, day = int(year), int(day)
         if bc:
-            year = -int(year)
-        return Date(int(year), month, int(day))
+            year = -year
+        if not _is_valid_day(year, month, day):
+            return None
+        return Date(year, month, day)
 
 
 class MonthYearFormat(DateFormat):
@@ -303,11 +343,11 @@ class MonthYearFormat(DateFormat):
     name = "MONTH_YEAR"
     pattern = re.compile(
         rf"\b({_MONTHS_PATTERN})\s*(?:AD\s*)?(\d{{2,4}})(?:\s+(BC|BCE))?\b",
-        re.IGNORECASE,
+        _DATE_FLAGS,
     )
 
     @classmethod
-    def match_to_date(cls, match: re.Match) -> Date:
+    def groups_to_date(cls, groups: tuple, match: re.Match) -> Date:
         # Check if there's a digit before the month
         start_pos = match.start()
 
@@ -316,7 +356,7 @@ class MonthYearFormat(DateFormat):
         if start_pos >= 2 and match.string[start_pos - 2 : start_pos].strip().isdigit():
             return None
 
-        month_str, year, bc = match.groups()
+        month_str, year, bc = groups
         month = cls.convert_month_to_number(month_str)
         if bc:
             year = -int(year)
@@ -327,14 +367,18 @@ class YearFormat(DateFormat):
     """Format for YYYY dates."""
 
     name = "YEAR"
+    # The lookahead rejects days, as the "1" of "from 1 January 1990", which
+    # would otherwise hide the full date in the single scan of extract_dates.
     pattern = re.compile(
-        r"\b(?:c\.|in|from|to)\s*(?:AD\s*)?(\d{1,4})(?:\s*(BC|BCE))?[\s,\.,\)]",
-        re.IGNORECASE,
+        r"\b(?:c\.|in|from|to)\s*(?:AD\s*)?(\d{1,4})"
+        rf"(?!\s*(?:{_MONTHS_PATTERN})\b)"
+        r"(?:\s*(BC|BCE))?[\s,\.,\)]",
+        _DATE_FLAGS,
     )
 
     @classmethod
-    def match_to_date(cls, match: re.Match) -> Date:
-        year, bc = match.groups()
+    def groups_to_date(cls, groups: tuple, match: re.Match) -> Date:
+        year, bc = groups
         year = int(year)
         if bc:
             year = -year
@@ -347,12 +391,11 @@ class WrittenDateFormat(DateFormat):
     name = "WRITTEN_DATE"
     pattern = re.compile(
         rf"\b({_MONTHS_PATTERN})\s+the\s+(?:(\d{{1,2}})(?:st|nd|rd|th)?|([a-z]+))[,\s]+(\d{{1,4}})+(?:\s+(BC|BCE))?\b",
-        re.IGNORECASE,
+        _DATE_FLAGS,
     )
 
     @classmethod
-    def match_to_date(cls, match: re.Match) -> datetime:
-        groups = match.groups()
+    def groups_to_date(cls, groups: tuple, match: re.Match) -> Date:
         month_str = groups[0]
 
         # Check if the day is a number or written out
@@ -363,12 +406,14 @@ class WrittenDateFormat(DateFormat):
             if written_day in _WRITTEN_NUMBERS:
                 day = _WRITTEN_NUMBERS[written_day]
             else:
-                raise ValueError(f"Unsupported written day number: {match.group(0)}")
+                return None
 
         year = int(groups[3])
         if groups[4]:
             year = -year
         month = cls.convert_month_to_number(month_str)
+        if not _is_valid_day(year, month, day):
+            return None
 
         return Date(year, month, day)
 
@@ -377,13 +422,14 @@ class WikiDateFormat(DateFormat):
     """Format for {{Birth date|YYYY|MM|DD|...}}."""
 
     name = "WIKI_BIRTH_DATE"
-    pattern = re.compile(r"{{[^|]*\|(\d{1,4})\|(\d{1,2})\|(\d{1,2}).*}}", re.IGNORECASE)
+    pattern = re.compile(r"{{[^|]*\|(\d{1,4})\|(\d{1,2})\|(\d{1,2}).*?}}", _DATE_FLAGS)
 
     @classmethod
-    def match_to_date(cls, match: re.Match) -> datetime:
-        year, month, day = match.groups()
-        # Check if the template is a birth date template
-        return Date(int(year), int(month), int(day))
+    def groups_to_date(cls, groups: tuple, match: re.Match) -> Date:
+        year, month, day = int(groups[0]), int(groups[1]), int(groups[2])
+        if not _is_valid_day(year, month, day):
+            return None
+        return Date(year, month, day)
 
 
 # Register all date format handlers
@@ -398,8 +444,51 @@ _DATE_FORMATS = [
     YearFormat,
 ]
 
+# All formats fused in a single pattern with one named group per format, so
+# that the text is scanned only once. Where several formats match at the same
+# position, the first one in _DATE_FORMATS wins.
+_COMBINED_DATE_REGEX = "|".join(
+    f"(?P<{fmt.name}>{fmt.pattern.pattern})" for fmt in _DATE_FORMATS
+)
+
+# Every format starts with (or right before) a digit, with "{{", with a month
+# name or with one of the YearFormat prefixes. Checking this first lets the
+# regex engine skip most positions of the text without trying each format.
+_DATE_START_HINT = (
+    r"(?=[0-9{]|.[0-9]|\b(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec"
+    r"|c\.|in|from|to))"
+)
+
+_COMBINED_DATE_PATTERN = re.compile(
+    f"{_DATE_START_HINT}(?:{_COMBINED_DATE_REGEX})", _DATE_FLAGS
+)
+
+
+def _contains_digit(text: str) -> bool:
+    """Return whether the text contains an ASCII digit.
+
+    All date formats contain at least one digit, so texts without digits (e.g.
+    redirects, short sections) can be skipped without running the date pattern.
+    Each `in` test is a fast C-level character search, so this is much faster
+    than a regex search on texts without digits.
+    """
+    return any(digit in text for digit in "0123456789")
+
+
+# Name of each format => (format, slice of its groups in the combined pattern)
+_FORMAT_BY_NAME = {
+    fmt.name: (
+        fmt,
+        slice(
+            _COMBINED_DATE_PATTERN.groupindex[fmt.name],
+            _COMBINED_DATE_PATTERN.groupindex[fmt.name] + fmt.pattern.groups,
+        ),
+    )
+    for fmt in _DATE_FORMATS
+}
 
-def extract_dates(text: str) -> List[Dict]:
+
+def extract_dates(text: str) -> List[DetectedDate]:
     """Extract dates from text with context information.
 
     Parameters
@@ -409,19 +498,68 @@ def extract_dates(text: str) -> List[Dict]:
 
     Returns
     -------
-    List[Dict]
-        A list of dictionaries containing:
-        - 'date_str': The original date string found
-        - 'format': The name of the date format
-        - 'datetime': The parsed datetime object (if parsing was successful)
+    List[DetectedDate]
+        The detected dates (with fields 'date', 'format' and 'date_str').
+        Matches that are not valid dates (like "31 February 2000") are skipped.
+    """
+    return [
+        detected_date
+        for detected_date in _iter_detections(text)
+        if detected_date is not None
+    ]
+
+
+def iter_date_matches(text: str) -> Iterator[Tuple[str, re.Match]]:
+    """Yield the (format name, match) of each date-like string of the text.
+
+    The text is scanned once with all the formats. The format name (e.g.
+    "MONTH_DAY_YEAR") tells which format matched, so the match can be turned
+    into a date without re-matching it. Unlike with `extract_dates`, matches
+    that are not valid dates (like "31 February 2000") are also yielded.
     """
-    all_results = []
-    all_errors = []
-    for date_format in _DATE_FORMATS:
-        results, errors = date_format.list_dates(text)
-        all_results.extend(results)
-        all_errors.extend(errors)
-    return all_results, all_errors
+    if not _contains_digit(text):
+        return
+    for match in _COMBINED_DATE_PATTERN.finditer(text):
+        yield match.lastgroup, match
+
+
+def list_date_strings(text: str) -> List[str]:
+    """Return the date-like strings of the text, as matched."""
+    return [match.group() for _, match in iter_date_matches(text)]
+
+
+def _iter_detections(text: str):
+    """Yield the detected date (or None if invalid) of each match."""
+    for format_name, match in iter_date_matches(text):
+        date_format, groups_slice = _FORMAT_BY_NAME[format_name]
+        groups = match.groups()[groups_slice]
+        yield date_format._detect(groups, match)
+
+
+def has_date(text: str) -> bool:
+    """Return whether the text contains at least one date.
+
+    This stops at the first valid date. If the dates are needed anyway, use
+    `bool(extract_dates(text))` rather than scanning the text twice.
+    """
+    return any(detected is not None for detected in _iter_detections(text))
+
+
+def has_date_batch(texts: Iterable[str]) -> List[bool]:
+    """Return, for each text, whether it contains at least one date.
+
+    Like `has_date`, each text is scanned with the combined date pattern until
+    its first valid date.
+    """
+    return [has_date(text) for text in texts]
+
+
+# Patterns of the date strings parsed by DateRange.from_parsed_string
+_BC_YEAR_PATTERN = re.compile(r"\b(\d{1,4})\s*BC\b")
+_YEAR_STRING_PATTERN = re.compile(r"^-?\d{1,4}$")
+_DECADE_STRING_PATTERN = re.compile(r"^(\d{1,3}0)s$")
+_YEAR_PAIR_STRING_PATTERN = re.compile(r"^(-?\d{1,4})/(-?\d{1,4})$")
+_FULL_DATE_STRING_PATTERN = re.compile(r"^(-?\d{1,4})/(\d{1,2})/(\d{1,2})$")
 
 
 @dataclass
@@ -464,24 +602,24 @@ class DateRange:
             return DateRange(start=start_range.start, end=end_range.end)
 
         # Replace YYYY BC with negative year
-        date = re.sub(r"\b(\d{1,4})\s*BC\b", r"-\1", date)
+        date = _BC_YEAR_PATTERN.sub(r"-\1", date)
 
         match date:
-            case _ if match := re.match(r"^-?\d{1,4}$", date):
+            case _ if match := _YEAR_STRING_PATTERN.match(date):
                 # Single year (e.g., "1810")
                 year = int(match.group(0))
                 return DateRange(
                     start=Date(year, 1, 1, is_approximate=True),
                     end=Date(year, 12, 31, is_approximate=True),
                 )
-            case _ if match := re.match(r"^(\d{1,3}0)s$", date):
+            case _ if match := _DECADE_STRING_PATTERN.match(date):
                 # Decade (e.g., "1930s")
                 decade_start = int(match.group(1))
                 return DateRange(
                     start=Date(decade_start, 1, 1, is_approximate=True),
                     end=Date(decade_start + 9, 12, 31, is_approximate=True),
                 )
-            case _ if match := re.match(r"^(-?\d{1,4})/(-?\d{1,4})$", date):
+            case _ if match := _YEAR_PAIR_STRING_PATTERN.match(date):
                 # Year range (e.g., "1810/1812")
 
                 # Only treat as year/year if the second number is > 12 (not a month)
@@ -512,7 +650,7 @@ class DateRange:
                         start=Date(year, month, 1, is_approximate=True),
                         end=Date(year, month, last_day, is_approximate=True),
                     )
-            case _ if match := re.match(r"^(-?\d{1,4})/(\d{1,2})/(\d{1,2})$", date):
+            case _ if match := _FULL_DATE_STRING_PATTERN.match(date):
                 # Full date (e.g., "1810/03/05")
                 year, month, day = map(int, match.groups())
                 return DateRange(
@@ -1,11 +1,17 @@
-from typing import List, Dict, Any
+from typing import Any, AsyncIterator, Dict, Iterable, List, Tuple
 import json
 import os
 from pathlib import Path
 import time
 import asyncio
+import functools
+import hashlib
+import re
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
 
 from pydantic import BaseModel
+from pydantic_core import from_json
 from pydantic_ai import Agent
 from pydantic_ai.settings import ModelSettings
 from wiki_dump_extractor import page_utils, date_utils
@@ -13,6 +19,7 @@ from dataclasses import dataclass, field
 from google import genai
 from google.genai._transformers import process_schema
 import mwparserfromhell
+import pyarrow
 from google.cloud import storage
 from google.cloud import aiplatform
 
@@ -31,30 +38,92 @@ class Event(BaseModel):
         return f"{self.when} - {self.where} ({self.city}) [{self.who}] {self.what}"
 
 
+EVENT_FIELDS = ["who", "what", "where", "city", "when"]
+
+
 class EventsList(BaseModel):
     events: List[Event]
 
     def to_string(self):
         return "\n\n".join([e.to_string() for e in self.events])
 
+    def to_record_batch(self) -> pyarrow.RecordBatch:
+        """Return the events as a pyarrow record batch, one column per field.
+
+        The columns are read from the events' attributes (no dict per event),
+        and the batches of many pages can be written to a single parquet file
+        with ``pyarrow.parquet.ParquetWriter``, where repetitive columns like
+        "city" get dictionary-encoded.
+        """
+        return pyarrow.record_batch(
+            {
+                name: pyarrow.array(
+                    [getattr(event, name) for event in self.events],
+                    type=pyarrow.string(),
+                )
+                for name in EVENT_FIELDS
+            }
+        )
+
+
+@functools.lru_cache(maxsize=None)
+def _get_genai_client() -> genai.Client:
+    """Return the Gemini client shared by all requests (created only once), so
+    that its HTTP connections are reused from one request to the next."""
+    return genai.Client(api_key=os.environ["GEMINI_API_KEY"])
+
+
+def create_events_prompt_cache(
+    model: str = "gemini-2.0-flash", ttl: str = "3600s", client: genai.Client = None
+) -> str:
+    """Create a Gemini context cache with the events prompt and return its name.
+
+    Requests created with ``cached_content=name`` then reference the cached
+    prompt instead of sending it with every page, which is billed at a lower
+    rate and reduces the latency of the calls. Note that Gemini only accepts
+    caches above a minimum number of tokens (which depends on the model).
+
+    Examples
+    --------
+
+    .. code:: python
+
+        cache_name = llm_utils.create_events_prompt_cache(model="gemini-2.5-flash")
+        request = PageEventExtractionRequest(title, text, cached_content=cache_name)
+        events, usage = request.run(model="gemini-2.5-flash")
+    """
+    if client is None:
+        client = _get_genai_client()
+    cache = client.caches.create(
+        model=model, config={"system_instruction": events_prompt, "ttl": ttl}
+    )
+    return cache.name
+
 
 @dataclass
 class PageEventExtractionRequest:
     page_title: str
     text: str
     model_settings: Dict[str, Any] = field(default_factory=lambda: {"temperature": 0})
+    # Name of a context cache holding the events prompt, see create_events_prompt_cache
+    cached_content: str = None
 
     def _get_run_params(self, client: genai.Client = None):
         if client is None:
-            client = genai.Client(api_key=os.environ["GEMINI_API_KEY"])
+            client = _get_genai_client()
         schema = EventsList.model_json_schema()
         process_schema(client=client, schema=schema)
+        if self.cached_content is not None:
+            # The prompt is already in the cache, only the page text is sent.
+            prompt_config = {"cached_content": self.cached_content}
+        else:
+            prompt_config = {"system_instruction": events_prompt}
         return {
             "contents": self.text,
             "config": {
                 "response_mime_type": "application/json",
                 "response_schema": schema,
-                "system_instruction": events_prompt,
+                **prompt_config,
                 "max_output_tokens": 8192,
                 **self.model_settings,
             },
@@ -70,25 +139,26 @@ class PageEventExtractionRequest:
         usage_dict = {
             "prompt_token_count": usage.prompt_token_count,
             "candidates_token_count": usage.candidates_token_count,
+            "cached_content_token_count": usage.cached_content_token_count,
         }
         events = EventsList(**response.parsed)
         return events, usage_dict
 
     def run(self, model: str = "gemini-2.0-flash"):
-        client = genai.Client(api_key=os.environ["GEMINI_API_KEY"])
+        client = _get_genai_client()
         params = self._get_run_params(client)
         response = client.models.generate_content(model=model, **params)
         return self._process_response(response)
 
     async def run_async(self, model: str = "gemini-2.0-flash"):
-        client = genai.AsyncClient(api_key=os.environ["GEMINI_API_KEY"])
+        client = _get_genai_client()
         params = self._get_run_params(client)
-        response = await client.models.generate_content(model=model, **params)
+        response = await client.aio.models.generate_content(model=model, **params)
         return self._process_response(response)
 
     def to_jsonl_request(self, client=None) -> str:
         if client is None:
-            client = genai.Client(api_key=os.environ["GEMINI_API_KEY"])
+            client = _get_genai_client()
         schema = EventsList.model_json_schema()
         process_schema(client=client, schema=schema)
         text = events_prompt + "\n\nBelow is the text to analyze:\n\n" + self.text
@@ -125,7 +195,7 @@ class PageEventExtractionRequest:
         path = Path(path)
         path.parent.mkdir(parents=True, exist_ok=True)
         # Write requests to JSONL file
-        api_client = genai.Client(api_key=os.environ["GEMINI_API_KEY"])
+        api_client = _get_genai_client()
         with open(path, "w") as f:
             for request in requests:
                 f.write(json.dumps(request.to_jsonl_request(api_client)) + "\n")
@@ -204,7 +274,8 @@ def process_batch_request(
     total_usage = {}
     with open(local_predictions_path, "r") as f:
         for line in f:
-            page_results = json.loads(line)
+            # pydantic's JSON parser (in Rust) is faster than json.loads.
+            page_results = from_json(line)
             page_title = page_results["page_title"]
             try:
                 usage = page_results["response"]["usageMetadata"]
@@ -215,7 +286,7 @@ def process_batch_request(
                         failed[page_title] = page_results
 
                     json_response = candidate["content"]["parts"][0]["text"]
-                    events = json.loads(json_response)["events"]
+                    events = from_json(json_response)["events"]
                     results_by_page[page_title] = events
             except Exception as e:
                 errored[page_title] = str(e)
@@ -273,13 +344,157 @@ async def get_all_events(
         results = await llm_utils.get_all_events(cleaned_text)
         print (results.data.to_string())
     """
-    agent = Agent(
+    agent = _get_agent(model, tuple(sorted(model_settings.items())))
+    return await agent.run(text)
+
+
+def _get_agent(model: str, model_settings: tuple) -> Agent:
+    """Return the events agent for a model and settings.
+
+    The agent is created only once per model and settings, unless a setting is
+    unhashable (e.g. a list of ``stop_sequences``) and can't be cached.
+    """
+    try:
+        hash(model_settings)
+    except TypeError:
+        return _create_agent(model, model_settings)
+    return _get_cached_agent(model, model_settings)
+
+
+def _create_agent(model: str, model_settings: tuple) -> Agent:
+    return Agent(
         model=model,
         system_prompt=events_prompt,
         result_type=EventsList,
-        model_settings=ModelSettings(**model_settings),
+        model_settings=ModelSettings(**dict(model_settings)),
     )
-    return await agent.run(text)
+
+
+@functools.lru_cache(maxsize=None)
+def _get_cached_agent(model: str, model_settings: tuple) -> Agent:
+    return _create_agent(model, model_settings)
+
+
+async def get_all_events_batch(
+    texts: List[str],
+    concurrency: int = 16,
+    model="google-gla:gemini-2.0-flash-lite",
+    return_exceptions: bool = False,
+    **model_settings,
+) -> List:
+    """Get all events in several texts, with concurrent LLM calls.
+
+    The calls are network-bound, so running up to ``concurrency`` of them at
+    the same time is much faster than awaiting them one by one. The texts are
+    sent from the shortest to the longest, so that the calls in flight have
+    similar sizes, but the results are in the same order as the texts.
+
+    With ``return_exceptions=True``, a failed call gives its exception in the
+    results instead of stopping the whole batch.
+
+    Examples
+    --------
+
+    .. code:: python
+
+        texts = [llm_utils.format_page_text_for_llm(page.text) for page in pages]
+        results = await llm_utils.get_all_events_batch(texts, concurrency=8)
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def get_events(text):
+        async with semaphore:
+            return await get_all_events(text, model=model, **model_settings)
+
+    order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+    sorted_results = await asyncio.gather(
+        *[get_events(texts[i]) for i in order], return_exceptions=return_exceptions
+    )
+    results = [None] * len(texts)
+    for i, result in zip(order, sorted_results):
+        results[i] = result
+    return results
+
+
+async def stream_events(
+    pages: Iterable,
+    concurrency: int = 16,
+    queue_size: int = 64,
+    model="google-gla:gemini-2.0-flash-lite",
+    **model_settings,
+) -> AsyncIterator[Tuple[Any, Any]]:
+    """Yield (page, events) pairs as the LLM calls on the pages complete.
+
+    The pages (e.g. from ``WikiAvroDumpExtractor.iter_pages()``) are read
+    lazily into a bounded queue, and read and cleaned in threads, so that this
+    overlaps with the LLM calls in flight (at most ``concurrency`` of them)
+    without loading the whole dump in memory. The pairs come in completion
+    order, not in the order of the pages.
+
+    Examples
+    --------
+
+    .. code:: python
+
+        async for page, result in llm_utils.stream_events(dump.iter_pages()):
+            print(page.title, result.data.to_string())
+    """
+    pages_queue = asyncio.Queue(queue_size)
+    results_queue = asyncio.Queue(queue_size)
+    end_of_queue = object()
+
+    async def read_pages():
+        # The pages are read (e.g. decompressed and parsed) in a thread, so that
+        # the event loop keeps running the LLM calls meanwhile.
+        page_iterator = iter(pages)
+        cancelled = False
+        try:
+            while (
+                page := await asyncio.to_thread(next, page_iterator, end_of_queue)
+            ) is not end_of_queue:
+                await pages_queue.put(page)
+        except asyncio.CancelledError:
+            cancelled = True
+            raise
+        finally:
+            # Once cancelled, the workers are cancelled too and won't make room
+            # in the bounded queue for the end markers.
+            if not cancelled:
+                for _ in range(concurrency):
+                    await pages_queue.put(end_of_queue)
+
+    async def process_pages():
+        try:
+            while (page := await pages_queue.get()) is not end_of_queue:
+                text = await asyncio.to_thread(format_page_text_for_llm, page.text)
+                result = await get_all_events(text, model=model, **model_settings)
+                await results_queue.put((page, result))
+        except asyncio.CancelledError:
+            # The results are not read anymore, so there may never be room in
+            # the bounded queue for the end marker.
+            raise
+        except Exception as error:
+            await results_queue.put(error)
+        await results_queue.put(end_of_queue)
+
+    reader = asyncio.create_task(read_pages())
+    workers = [asyncio.create_task(process_pages()) for _ in range(concurrency)]
+    try:
+        n_running_workers = concurrency
+        while n_running_workers:
+            item = await results_queue.get()
+            if item is end_of_queue:
+                n_running_workers -= 1
+            elif isinstance(item, Exception):
+                raise item
+            else:
+                yield item
+        # Raise the error of the page iterator, if any.
+        await reader
+    finally:
+        for task in [reader, *workers]:
+            task.cancel()
+        await asyncio.gather(reader, *workers, return_exceptions=True)
 
 
 def format_value(value: str) -> str:
@@ -288,48 +503,175 @@ def format_value(value: str) -> str:
     # Find all WikiDateFormat patterns in the value and replace them with formatted dates
 
 
+# The regex-based cleanup steps of clean_text_for_llm (section titles, comments
+# and citations, file links, wiki dates) fused in a single pattern so that the
+# text is traversed once. At a given position, the first matching branch wins.
+_CLEANUP_BRANCHES = {
+    "subsection": r"(?m:^===\s*(.*?)\s*===)",
+    "section": r"(?m:^==\s*(.*?)\s*==)",
+    "chapter": r"(?m:^=\s*(.*?)\s*=)",
+    "removed": (
+        r"<!--.*?-->"
+        r"|\{\{(?:Cite|cite|citation|sfn).*?\}\}"
+        r"|<ref>.*?</ref>"
+        r"|<ref[^>]*/>"
+        r"|<ref.*?>.*?</ref>"
+    ),
+    "file_link": r"(?s:\[\[(?:File|Image):(.*?)\]\])",
+    "wiki_date": date_utils.WikiDateFormat.pattern.pattern,
+}
+# All branches start with "=", "<", "{" or "[". Checking this first lets the
+# regex engine skip most positions without trying each branch.
+_CLEANUP_PATTERN = re.compile(
+    r"(?=[=<{\[])(?:"
+    + "|".join(f"(?P<{name}>{pattern})" for name, pattern in _CLEANUP_BRANCHES.items())
+    + ")",
+    re.ASCII,
+)
+
+
+def _clean_up_title(match, label):
+    title = match.group(_CLEANUP_PATTERN.groupindex[label.lower()] + 1)
+    return f"\n{label}: {_clean_up(title)}\n\n"
+
+
+def _clean_up_file_link(match):
+    content = _clean_up(match.group(_CLEANUP_PATTERN.groupindex["file_link"] + 1))
+    parts = [part.strip() for part in content.split("|")]
+    if len(parts) == 1:
+        # Just [[File:filename.jpg]] — remove it
+        return ""
+    # [[File:filename.jpg|...|...|text of interest]]
+    return f"\n\n(image caption: {parts[-1]})\n\n"
+
+
+def _format_wiki_date(match) -> str:
+    """Return the date of a wiki date template as a string, or the template
+    itself if it isn't a valid date."""
+    start = _CLEANUP_PATTERN.groupindex["wiki_date"]
+    groups = match.groups()[start : start + 3]
+    date = date_utils.WikiDateFormat.groups_to_date(groups, match)
+    if date is None:
+        return match.group(0)
+    return date.to_string() + "  "
+
+
+_CLEANUP_HANDLERS = {
+    "subsection": lambda match: _clean_up_title(match, "Subsection"),
+    "section": lambda match: _clean_up_title(match, "Section"),
+    "chapter": lambda match: _clean_up_title(match, "Chapter"),
+    "removed": lambda match: " ",
+    "file_link": _clean_up_file_link,
+    "wiki_date": _format_wiki_date,
+}
+
+
+def _clean_up(text: str) -> str:
+    return _CLEANUP_PATTERN.sub(
+        lambda match: _CLEANUP_HANDLERS[match.lastgroup](match), text
+    )
+
+
+# Characters that mwparserfromhell could parse as markup (or HTML entities).
+# Texts without any of them are returned unchanged by strip_code.
+_WIKI_MARKUP_PATTERN = re.compile(r"[{}\[\]<>&'=*#:;_~\n]")
+
+
 def clean_text_for_llm(text: str) -> str:
     text = page_utils.remove_appendix_sections(text)
-    text = page_utils.replace_titles_with_section_headers(text)
-    text = page_utils.remove_comments_and_citations(text)
-    text = page_utils.replace_file_links_with_captions(text)
+    # Done first, as "{{Nbsp}}" would otherwise be taken for a wiki date start.
     text = page_utils.replace_nsbp_by_spaces(text)
-    text = text
+    text = _clean_up(text)
+    if not _WIKI_MARKUP_PATTERN.search(text):
+        # Plain text (like many infobox values), no need to parse it.
+        return text
+    fully_parsed = mwparserfromhell.parse(text).strip_code()
+    # Leftover brackets (e.g. from malformed links) are rare, check first.
+    if "[[" in fully_parsed:
+        fully_parsed = fully_parsed.replace("[[", "")
+    if "]]" in fully_parsed:
+        fully_parsed = fully_parsed.replace("]]", "")
+    return fully_parsed
 
-    for match in date_utils.WikiDateFormat.pattern.finditer(text):
-        try:
-            date = date_utils.WikiDateFormat.match_to_date(match)
-            formatted_date = date.to_string() + "  "
-            # Replace the matched pattern with the formatted date
-            text = text.replace(match.group(0), formatted_date)
-        except (ValueError, AttributeError):
-            # Skip if date parsing fails
-            continue
-    fully_parsed = str(mwparserfromhell.parse(text).strip_code())
-    return str(fully_parsed.replace("[[", "").replace("]]", ""))
-
-
-def format_page_text_for_llm(text: str, include_infobox: bool = True) -> str:
-    """Format the page by (1) parsing the infox and (2) cleaning the main body"""
-    infobox, infobox_text = page_utils.parse_infobox(text)
-    if infobox:
-        text = text.replace(infobox_text, "")
+
+# Infobox values longer than this are cleaned without caching, so that the
+# cache only keeps small strings.
+_MAX_CACHED_INFOBOX_VALUE_LENGTH = 200
+
+
+@functools.lru_cache(maxsize=4096)
+def _clean_short_infobox_value(value: str) -> str:
+    return clean_text_for_llm(value)
+
+
+def _clean_infobox_value(value: str) -> str:
+    """Clean an infobox value, with a cache for the short ones.
+
+    Many short values (e.g. country names) are shared across pages.
+    """
+    if len(value) > _MAX_CACHED_INFOBOX_VALUE_LENGTH:
+        return clean_text_for_llm(value)
+    return _clean_short_infobox_value(value)
+
+
+@functools.lru_cache(maxsize=None)
+def _get_cache_connection(cache_path: str, pid: int) -> sqlite3.Connection:
+    """Return a connection to the cache database, one per process (the pid is
+    part of the cache key, as sqlite connections can't be used after a fork).
+    """
+    connection = sqlite3.connect(cache_path, timeout=60, isolation_level=None)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute(
+        "CREATE TABLE IF NOT EXISTS formatted_pages "
+        "(key BLOB PRIMARY KEY, formatted_text TEXT)"
+    )
+    return connection
+
+
+def format_page_text_for_llm(
+    text: str, include_infobox: bool = True, cache_path: str = None
+) -> str:
+    """Format the page by (1) parsing the infox and (2) cleaning the main body
+
+    If a ``cache_path`` is given, the formatted texts are stored in a sqlite
+    database at this path, keyed by a hash of the page text, so that pages
+    that are processed again (e.g. to compare models) are not cleaned again.
+    """
+    if cache_path is None:
+        return _format_page_text_for_llm(text, include_infobox)
+    # blake2b hashes at over 1GB/s, which is negligible compared to the cleanup.
+    key = hashlib.blake2b(
+        text.encode(), digest_size=16, person=b"infobox" if include_infobox else b""
+    ).digest()
+    connection = _get_cache_connection(str(cache_path), os.getpid())
+    row = connection.execute(
+        "SELECT formatted_text FROM formatted_pages WHERE key = ?", (key,)
+    ).fetchone()
+    if row is not None:
+        return row[0]
+    formatted_text = _format_page_text_for_llm(text, include_infobox)
+    connection.execute(
+        "INSERT OR REPLACE INTO formatted_pages VALUES (?, ?)", (key, formatted_text)
+    )
+    return formatted_text
+
+
+def _format_page_text_for_llm(text: str, include_infobox: bool) -> str:
+    infobox, text = page_utils.split_infobox(text)
 
     formatted_text = clean_text_for_llm(text)
     if not include_infobox:
         return formatted_text
 
-    if infobox is None:
+    if not infobox:
         return formatted_text
 
-    cleaned_fields = [
-        (key.replace("_", " "), clean_text_for_llm(value))
-        for key, value in infobox.items()
-        if value.strip() != ""
-    ]
-    str_fields = [
-        f"- {key}: {value}" for key, value in cleaned_fields if value.strip() != ""
-    ]
+    str_fields = []
+    for key, value in infobox.items():
+        if value.strip():
+            cleaned_value = _clean_infobox_value(value)
+            if cleaned_value.strip():
+                str_fields.append(f"- {key.replace('_', ' ')}: {cleaned_value}")
 
     return (
         "Infos from the infobox:\n"
@@ -340,4 +682,53 @@ def format_page_text_for_llm(text: str, include_infobox: bool = True) -> str:
     )
 
 
-__all__ = ["get_all_events", "PageEventExtractionRequest"]
+def clean_pages_parallel(
+    texts: Iterable[str],
+    workers: int = None,
+    include_infobox: bool = True,
+    chunksize: int = 16,
+    cache_path: str = None,
+) -> List[str]:
+    """Format many page texts for the LLM, on several processes.
+
+    The cleanup is pure Python (regexes and mwparserfromhell), so it doesn't
+    go faster with threads. Here the pages are sent to ``workers`` processes
+    (by default one per core) by chunks of ``chunksize`` pages.
+
+    Parameters
+    ----------
+    texts : Iterable[str]
+        The page texts to format.
+    workers : int, optional
+        The number of processes, by default the number of cores.
+    include_infobox : bool, optional
+        Passed to ``format_page_text_for_llm``.
+    chunksize : int, optional
+        The number of pages sent to a process at once. Larger chunks mean
+        fewer round-trips between processes.
+    cache_path : str, optional
+        Passed to ``format_page_text_for_llm``, to reuse the formatted texts
+        of pages that were already processed.
+
+    Returns
+    -------
+    List[str]
+        The formatted texts, in the order of the input texts.
+    """
+    format_page = functools.partial(
+        format_page_text_for_llm,
+        include_infobox=include_infobox,
+        cache_path=cache_path,
+    )
+    with ProcessPoolExecutor(workers) as executor:
+        return list(executor.map(format_page, texts, chunksize=chunksize))
+
+
+__all__ = [
+    "get_all_events",
+    "get_all_events_batch",
+    "stream_events",
+    "clean_pages_parallel",
+    "PageEventExtractionRequest",
+    "create_events_prompt_cache",
+]
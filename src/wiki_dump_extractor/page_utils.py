@@ -2,13 +2,17 @@ from typing import Tuple, Optional, List
 
 from dataclasses import dataclass, field
 import re
-import regex
+
+# The patterns used on every page are compiled once, at import time.
+_SHORT_DESCRIPTION_PATTERN = re.compile(
+    r"\{\{short description\|(.*?)\}\}", re.IGNORECASE
+)
 
 
 def get_short_description(text: str) -> str:
     """Return the short description of the page."""
     # Look for {{short description|...}} template
-    match = re.search(r"\{\{short description\|(.*?)\}\}", text, re.IGNORECASE)
+    match = _SHORT_DESCRIPTION_PATTERN.search(text)
     if match:
         return match.group(1).strip()
     return ""
@@ -32,9 +36,9 @@ def remove_appendix_sections(text: str) -> str:
     return re.sub(r"== References ==.*?== Notes ==.*?", "", text, flags=re.DOTALL)
 
 
-def remove_comments_and_citations(text: str) -> str:
-    """Return the text without comments and citations."""
-    patterns = [
+_COMMENTS_AND_CITATIONS_PATTERNS = [
+    re.compile(pattern)
+    for pattern in [
         r"<!--.*?-->",
         r"{{Cite.*?}}",
         r"{{cite.*?}}",
@@ -44,21 +48,33 @@ def remove_comments_and_citations(text: str) -> str:
         r"<ref.*?>.*?</ref>",
         r"<ref.*?/>",
     ]
-    for pattern in patterns:
-        text = re.sub(pattern, " ", text)
+]
+
+
+def remove_comments_and_citations(text: str) -> str:
+    """Return the text without comments and citations."""
+    for pattern in _COMMENTS_AND_CITATIONS_PATTERNS:
+        text = pattern.sub(" ", text)
 
     return text
 
 
+_TITLE_PATTERNS_AND_REPLACEMENTS = [
+    (re.compile(r"^===\s*(.*?)\s*===", re.MULTILINE), r"\nSubsection: \1\n\n"),
+    (re.compile(r"^==\s*(.*?)\s*==", re.MULTILINE), r"\nSection: \1\n\n"),
+    (re.compile(r"^=\s*(.*?)\s*=", re.MULTILINE), r"\nChapter: \1\n\n"),
+]
+
+
 def replace_titles_with_section_headers(text):
-    text = re.sub(
-        r"^===\s*(.*?)\s*===", r"\nSubsection: \1\n\n", text, flags=re.MULTILINE
-    )
-    text = re.sub(r"^==\s*(.*?)\s*==", r"\nSection: \1\n\n", text, flags=re.MULTILINE)
-    text = re.sub(r"^=\s*(.*?)\s*=", r"\nChapter: \1\n\n", text, flags=re.MULTILINE)
+    for pattern, replacement in _TITLE_PATTERNS_AND_REPLACEMENTS:
+        text = pattern.sub(replacement, text)
     return text
 
 
+_FILE_LINK_PATTERN = re.compile(r"\[\[(File|Image):(.*?)\]\]", re.DOTALL)
+
+
 def replace_file_links_with_captions(text):
     def replace_file_tag(match):
         # Extract the full content between File/Image: and ]]
@@ -72,12 +88,7 @@ def replace_file_links_with_captions(text):
             return f"\n\n(image caption: {parts[-1]})\n\n"  # assume last part is the text of interest
 
     # Match both File and Image tags
-    return re.sub(
-        r"\[\[(File|Image):(.*?)\]\]",
-        replace_file_tag,
-        text,
-        flags=re.DOTALL,
-    )
+    return _FILE_LINK_PATTERN.sub(replace_file_tag, text)
 
 
 def replace_nsbp_by_spaces(text: str) -> str:
@@ -85,6 +96,31 @@ def replace_nsbp_by_spaces(text: str) -> str:
     return text.replace("&nbsp;", " ").replace("{{Nbsp}}", " ").replace("<br />", " ; ")
 
 
+_COORD_PATTERN = re.compile(
+    r"""
+    \{\{[Cc]oord\s*\|
+    (\d+)\s*\|              # Degrees latitude
+    (\d+)\s*\|              # Minutes latitude
+    (\d+)?\s*\|?            # Optional seconds latitude
+    ([NS])\s*\|             # North/South indicator
+    (\d+)\s*\|              # Degrees longitude
+    (\d+)\s*\|              # Minutes longitude
+    (\d+)?\s*\|?            # Optional seconds longitude
+    ([EW])                  # East/West indicator
+    """,
+    re.VERBOSE,
+)
+_INFOBOX_LATLON_PATTERN = re.compile(
+    r"""
+    \|\s*(?:
+        latitude\s*=\s*([+-]?\d+\.?\d*)|
+        longitude\s*=\s*([+-]?\d+\.?\d*)
+    )
+    """,
+    re.VERBOSE | re.IGNORECASE,
+)
+
+
 def extract_geospatial_coordinates(text: str) -> Optional[Tuple[float, float]]:
     """Return geographical coordinates (latitude, longitude) from Wikipedia page text.
 
@@ -102,47 +138,28 @@ def extract_geospatial_coordinates(text: str) -> Optional[Tuple[float, float]]:
         return None
 
     # Match {{Coord}} template variations
-    coord_pattern = r"""
-        \{\{[Cc]oord\s*\|
-        (\d+)\s*\|              # Degrees latitude
-        (\d+)\s*\|              # Minutes latitude
-        (\d+)?\s*\|?            # Optional seconds latitude
-        ([NS])\s*\|             # North/South indicator
-        (\d+)\s*\|              # Degrees longitude
-        (\d+)\s*\|              # Minutes longitude
-        (\d+)?\s*\|?            # Optional seconds longitude
-        ([EW])                  # East/West indicator
-    """
-    match = re.search(coord_pattern, text, re.VERBOSE)
+    match = _COORD_PATTERN.search(text)
 
     if match:
-        try:
-            lat_deg, lat_min, lat_sec, lat_dir = match.group(1, 2, 3, 4)
-            lon_deg, lon_min, lon_sec, lon_dir = match.group(5, 6, 7, 8)
-
-            # Convert to decimal degrees
-            lat = float(lat_deg) + float(lat_min) / 60 + (float(lat_sec or 0) / 3600)
-            lon = float(lon_deg) + float(lon_min) / 60 + (float(lon_sec or 0) / 3600)
-
-            # Apply direction
-            if lat_dir == "S":
-                lat = -lat
-            if lon_dir == "W":
-                lon = -lon
+        lat_deg, lat_min, lat_sec, lat_dir = match.group(1, 2, 3, 4)
+        lon_deg, lon_min, lon_sec, lon_dir = match.group(5, 6, 7, 8)
+
+        # Convert to decimal degrees. The groups are all digits (so int() can't
+        # fail and is faster than float()), and the direction gives the sign.
+        lat_sign = -1.0 if lat_dir == "S" else 1.0
+        lon_sign = -1.0 if lon_dir == "W" else 1.0
+        lat = lat_sign * (
+            int(lat_deg) + int(lat_min) / 60 + (int(lat_sec) if lat_sec else 0) / 3600
+        )
+        lon = lon_sign * (
+            int(lon_deg) + int(lon_min) / 60 + (int(lon_sec) if lon_sec else 0) / 3600
+        )
 
-            if -90 <= lat <= 90 and -180 <= lon <= 180:
-                return (lat, lon)
-        except ValueError:
-            pass
+        if -90 <= lat <= 90 and -180 <= lon <= 180:
+            return (lat, lon)
 
     # Match coordinates in infoboxes
-    infobox_pattern = r"""
-        \|\s*(?:
-            latitude\s*=\s*([+-]?\d+\.?\d*)|
-            longitude\s*=\s*([+-]?\d+\.?\d*)
-        )
-    """
-    matches = re.finditer(infobox_pattern, text, re.VERBOSE | re.IGNORECASE)
+    matches = _INFOBOX_LATLON_PATTERN.finditer(text)
     lat = lon = None
     for match in matches:
         if match.group(1):  # latitude
@@ -163,6 +180,13 @@ def extract_geospatial_coordinates(text: str) -> Optional[Tuple[float, float]]:
     return None
 
 
+_CATEGORY_PATTERN = re.compile(
+    r"\[\[Category:([^|\]]+)(?:\|[^\]]+)?\]\]", re.IGNORECASE
+)
+_COMMENT_PATTERN = re.compile(r"<!--.*?-->")
+_WHITESPACES_PATTERN = re.compile(r"\s+")
+
+
 def extract_categories(text: str) -> List[str]:
     """Extract categories from Wikipedia text.
 
@@ -178,17 +202,15 @@ def extract_categories(text: str) -> List[str]:
     """
     # Match standard category syntax, handling both [[Category:Name]] and [[Category:Name|*]] formats
     # The pipe character can be used for sorting in Wikipedia but we don't need that part
-    categories = re.findall(
-        r"\[\[Category:([^|\]]+)(?:\|[^\]]+)?\]\]", text, re.IGNORECASE
-    )
+    categories = _CATEGORY_PATTERN.findall(text)
 
     # Clean up category names
     cleaned_categories = []
     for category in categories:
         # Remove HTML comments
-        category = re.sub(r"<!--.*?-->", "", category)
+        category = _COMMENT_PATTERN.sub("", category)
         # Normalize whitespace
-        category = re.sub(r"\s+", " ", category.strip())
+        category = _WHITESPACES_PATTERN.sub(" ", category.strip())
         if category:
             cleaned_categories.append(category)
 
@@ -196,6 +218,9 @@ def extract_categories(text: str) -> List[str]:
     return sorted(set(cleaned_categories))
 
 
+_INFOBOX_CATEGORY_PATTERN = re.compile(r"\{\{Infobox\s+([^\|\}]+)")
+
+
 def extract_infobox_category(text: str) -> Optional[str]:
     """Extract the broad category from the infobox of a Wikipedia page.
 
@@ -204,32 +229,47 @@ def extract_infobox_category(text: str) -> Optional[str]:
     text : str
         The wikipedia page text to extract the infobox category from.
     """
-    infobox_match = re.search(r"\{\{Infobox\s+([^\|\}]+)", text)
+    infobox_match = _INFOBOX_CATEGORY_PATTERN.search(text)
     if infobox_match:
         broad_category = infobox_match.group(1).strip().lower()
         broad_category = broad_category.split("\n")[0].split("<!--")[0].split("|")[0]
         broad_category = broad_category.strip()
-
-
-# Compile the pattern once for better performance
-BRACE_PATTERN = regex.compile(r"\{\{(?:[^{}]|(?R))*\}\}")
+        return broad_category
+    return None
 
 
 def _find_matching_braces(text, start_pos):
-    """Find the position of the matching closing braces from a starting position."""
-    # Assume we're already inside a {{ pair, so we need to find the matching }}
-    # Extract the substring starting from start_pos
-    substring = text[start_pos:]
+    """Find the position right after the "}}" closing the "{{" at start_pos.
 
-    # Look for the pattern that matches balanced braces
-    match = BRACE_PATTERN.search(substring)
+    This jumps from one "{{" or "}}" to the next with str.find, counting the
+    nesting depth, so it runs at C speed over the text in between. Returns -1
+    if the braces are not closed.
+    """
+    depth = 0
+    position = start_pos
+    next_open = text.find("{{", position)
+    while True:
+        next_close = text.find("}}", position)
+        if next_close == -1:
+            return -1
+        if next_open != -1 and next_open < next_close:
+            depth += 1
+            position = next_open + 2
+            next_open = text.find("{{", position)
+        else:
+            depth -= 1
+            position = next_close + 2
+            if depth == 0:
+                return position
+            if next_open != -1 and next_open < position:
+                # This "{{" overlapped with the "}}" (as in "}}}{{")
+                next_open = text.find("{{", position)
 
-    if match:
-        # Calculate the end position in the original string
-        # Add 2 for the closing braces
-        return start_pos + match.end()
 
-    return -1
+_INFOBOX_FIRST_LINE_PATTERN = re.compile(r"([^\|\n]+)")
+_INFOBOX_FIELD_PATTERN = re.compile(
+    r"\|\s*([a-z0-9_]+)\s*=(.*)(?=\n\||$)", re.MULTILINE
+)
 
 
 def parse_infobox(page_text: str) -> Tuple[dict, str]:
@@ -262,51 +302,84 @@ def parse_infobox(page_text: str) -> Tuple[dict, str]:
         The infobox as a dictionary.
     """
 
-    # Find the infobox pattern with proper handling of nested templates
+    infobox_start, infobox_end = _find_infobox(page_text)
+    if infobox_start == -1:
+        return {}, ""
+    infobox_text = page_text[infobox_start:infobox_end]
+    return _parse_infobox_text(infobox_text), infobox_text
+
+
+def split_infobox(page_text: str) -> Tuple[dict, str]:
+    """Return the infobox of a page and the page text without the infobox.
+
+    This is the same as using ``parse_infobox`` then removing the infobox text
+    from the page text, but the page is cut at the infobox position found by
+    the parsing, rather than searched again for the infobox text.
+
+    Parameters
+    ----------
+    page_text : str
+        The wikipedia page text to extract the infobox from.
 
+    Returns
+    -------
+    tuple[dict, str]
+        The infobox as a dictionary (empty if the page has no infobox), and
+        the page text without the infobox.
+    """
+    infobox_start, infobox_end = _find_infobox(page_text)
+    if infobox_start == -1:
+        return {}, page_text
+    infobox = _parse_infobox_text(page_text[infobox_start:infobox_end])
+    return infobox, page_text[:infobox_start] + page_text[infobox_end:]
+
+
+def _find_infobox(page_text: str) -> Tuple[int, int]:
+    """Return the (start, end) positions of the infobox, or (-1, -1)."""
+    # Find the infobox pattern with proper handling of nested templates
     infobox_start = page_text.find("{{Infobox")
     if infobox_start == -1:
-        return {}, ""
+        return -1, -1
 
     infobox_end = _find_matching_braces(page_text, infobox_start)
     if infobox_end == -1:
-        return {}, ""
+        return -1, -1
+    return infobox_start, infobox_end
+
 
-    original_infobox_text = page_text[infobox_start:infobox_end]
+def _parse_infobox_text(original_infobox_text: str) -> dict:
     infobox_text = original_infobox_text.replace("{{Infobox", "")
 
     # Extract the category (first line after "{{Infobox")
-    category_match = re.match(r"([^\|\n]+)", infobox_text)
+    category_match = _INFOBOX_FIRST_LINE_PATTERN.match(infobox_text)
     category = category_match.group(1).strip().lower() if category_match else ""
-    category = re.sub(r"<!--.*?-->", "", category)
+    category = _COMMENT_PATTERN.sub("", category)
 
     # Parse the key-value pairs
     result = {"category": category}
 
     # Find all lines starting with "|"
-    field_matches = re.finditer(
-        r"\|\s*([a-z0-9_]+)\s*=(.*)(?=\n\||$)",
-        infobox_text,
-        re.MULTILINE,
-    )
+    field_matches = _INFOBOX_FIELD_PATTERN.finditer(infobox_text)
 
     for match in field_matches:
         key = match.group(1).strip()
         value = match.group(2).strip()
 
         # Remove HTML comments from value
-        value = re.sub(r"<!--.*?-->", "", value)
+        value = _COMMENT_PATTERN.sub("", value)
         result[key] = value
 
-    return result, original_infobox_text
+    return result
+
+
+_LINK_PATTERN = re.compile(r"\[\[([^|]+?)(?:\|(.*?))?\]\]")
 
 
 def extract_links(wiki_text):
     """Extract all the links of the form [[true page|text]] in a dict of the form
     {text: true page}"""
-    pattern = r"\[\[([^|]+?)(?:\|(.*?))?\]\]"
     result = {}
-    for match in re.finditer(pattern, wiki_text):
+    for match in _LINK_PATTERN.finditer(wiki_text):
         if not match.group(2):
             text = match.group(1).strip()
             page = text.replace("_", " ")
@@ -325,6 +398,11 @@ def extract_links(wiki_text):
     return result
 
 
+# Pattern to match filename in MediaWiki file syntax
+# [[File:filename.ext|...]] or [[Image:filename.ext|...]]
+_FILENAME_PATTERN = re.compile(r"\[\[(File|Image):([^|]+?)(?:\|.*?)?\]\]")
+
+
 def extract_filenames(wiki_text):
     """
     Extract the filename from a MediaWiki file link using regular expressions.
@@ -335,21 +413,26 @@ def extract_filenames(wiki_text):
     Yields:
         str: Each extracted filename found in the text
     """
-    # Pattern to match filename in MediaWiki file syntax
-    # [[File:filename.ext|...]] or [[Image:filename.ext|...]]
-    pattern = r"\[\[(File|Image):([^|]+?)(?:\|.*?)?\]\]"
-
-    for match in re.finditer(pattern, wiki_text):
+    for match in _FILENAME_PATTERN.finditer(wiki_text):
         yield match.group(2).strip()
 
 
-@dataclass
+# Patterns to match section headers, in a page or in a single line
+_SECTION_HEADERS_PATTERN = re.compile(r"^(=+)\s*(.*?)\s*\1$", re.MULTILINE)
+_SECTION_HEADER_PATTERN = re.compile(r"^(=+)\s*(.*?)\s*\1$")
+
+
+@dataclass(slots=True)
 class Section:
     level: int
     title: str
     text: str = ""
     children: List["Section"] = field(default_factory=list)
     parent: Optional["Section"] = None
+    # Cache of title_with_parents, computed on first access
+    _title_with_parents: Optional[str] = field(
+        default=None, init=False, repr=False, compare=False
+    )
 
     def to_dict(self):
         """Convert the Section to a dictionary representation."""
@@ -361,10 +444,18 @@ class Section:
 
     @property
     def title_with_parents(self):
-        if self.parent is not None and self.parent.title is not None:
-            return f"{self.parent.title_with_parents} > {self.title}"
-        else:
-            return self.title
+        """Return the title prefixed by the titles of the parents, e.g. "A > B".
+
+        This is computed once, on first access, so the tree shouldn't be
+        modified afterwards.
+        """
+        if self._title_with_parents is None:
+            if self.parent is not None and self.parent.title is not None:
+                title = f"{self.parent.title_with_parents} > {self.title}"
+            else:
+                title = self.title
+            self._title_with_parents = title
+        return self._title_with_parents
 
     def with_cleaned_text(self):
         text = remove_comments_and_citations(self.text)
@@ -382,11 +473,8 @@ class Section:
         root_section = Section(level=0, title="Root", text="")
         section_stack = [root_section]
 
-        # Pattern to match section headers
-        header_pattern = re.compile(r"^(=+)\s*(.*?)\s*\1$", re.MULTILINE)
-
         # Find all section headers
-        header_matches = list(header_pattern.finditer(text))
+        header_matches = list(_SECTION_HEADERS_PATTERN.finditer(text))
 
         # If no headers found, put all text in root section
         if not header_matches:
@@ -477,7 +565,7 @@ class Section:
             return Section(level=0, title=None, text=section_text)
         header, text = section_text.split("\n", 1)
 
-        match = re.match(r"^(=+)\s*(.*?)\s*\1$", header)
+        match = _SECTION_HEADER_PATTERN.match(header)
         if match:
             equals = match.group(1)
             title = match.group(2)
@@ -10,17 +10,27 @@ from typing import (
     AsyncGenerator,
     Tuple,
 )
-from dataclasses import dataclass, asdict
+from collections import namedtuple
+from dataclasses import dataclass
+import functools
 from datetime import datetime
 import multiprocessing
 import itertools
 from pathlib import Path
-from copy import deepcopy
+from contextlib import ExitStack, contextmanager
 import json
 import bz2
+import io
+import mmap
+import os
+import queue
+import threading
 import fastavro
+from fastavro.read import BLOCK_READERS
 import shutil
+import subprocess
 import lmdb
+import zstandard
 
 from lxml import etree
 from tqdm.auto import tqdm
@@ -28,8 +38,101 @@ import aiostream
 
 from .page_utils import extract_categories
 
+try:
+    # Decompresses the blocks of .bz2 files in parallel, on several cores.
+    import indexed_bzip2
+except ImportError:
+    indexed_bzip2 = None
 
-@dataclass
+
+# The (namespaced) tags of the page fields in a <page> element.
+_PageTags = namedtuple(
+    "_PageTags", ["title", "id", "redirect", "revision", "timestamp", "text"]
+)
+
+
+@functools.lru_cache(maxsize=None)
+def _get_page_tags(namespace: str) -> _PageTags:
+    """Return the tags of the page fields (built only once per namespace)."""
+    return _PageTags(*(f"{{{namespace}}}{name}" for name in _PageTags._fields))
+
+
+def _parse_timestamp(timestamp: str) -> datetime:
+    """Parse a dump timestamp like "2024-03-05T12:34:56Z".
+
+    fromisoformat is ~30x faster than strptime, which is only used as a
+    fallback for timestamps in other formats.
+    """
+    try:
+        return datetime.fromisoformat(timestamp.rstrip("Z"))
+    except ValueError:
+        return datetime.strptime(timestamp, "%Y-%m-%dT%H:%M:%SZ")
+
+
+def _timestamp_to_isoformat(timestamp: str) -> str:
+    """Return a dump timestamp as in Page.to_avro_record ("2024-03-05T12:34:56").
+
+    Timestamps in the usual "YYYY-MM-DDTHH:MM:SSZ" form only lose their "Z",
+    without building a datetime (~8x faster).
+    """
+    if len(timestamp) == 20 and timestamp[10] == "T" and timestamp[19] == "Z":
+        return timestamp[:19]
+    return _parse_timestamp(timestamp).isoformat()
+
+
+def _read_page_fields(elem: etree.Element, tags: _PageTags) -> dict:
+    """Return the fields of a <page> element, with the timestamp as in the XML.
+
+    The children are walked once, comparing their tags, which is faster than
+    looking up each field with find() or XPath. The title, id and redirect
+    come before the revision in the dumps, and only the first revision is read.
+    """
+    fields = {
+        "page_id": None,
+        "title": None,
+        "timestamp": None,
+        "redirect_title": None,
+        "revision_id": None,
+        "text": None,
+    }
+    for child in elem:
+        tag = child.tag
+        if tag == tags.title:
+            fields["title"] = child.text
+        elif tag == tags.id:
+            fields["page_id"] = int(child.text)
+        elif tag == tags.redirect:
+            fields["redirect_title"] = child.get("title")
+        elif tag == tags.revision:
+            for revision_child in child:
+                tag = revision_child.tag
+                if tag == tags.id:
+                    fields["revision_id"] = revision_child.text
+                elif tag == tags.timestamp:
+                    fields["timestamp"] = revision_child.text
+                elif tag == tags.text:
+                    fields["text"] = revision_child.text
+            break
+    return fields
+
+
+def _read_page_header(elem: etree.Element, tags: _PageTags) -> Tuple[str, int, bool]:
+    """Return the title, ID and redirect status of a <page> element."""
+    title, page_id, is_redirect = None, None, False
+    for child in elem:
+        tag = child.tag
+        if tag == tags.title:
+            title = child.text
+        elif tag == tags.id:
+            page_id = int(child.text)
+        elif tag == tags.redirect:
+            is_redirect = True
+        elif tag == tags.revision:
+            break
+    return title, page_id, is_redirect
+
+
+@dataclass(slots=True)
 class Page:
     """
     Represents a page in the Wikipedia dump.
@@ -57,8 +160,6 @@ class Page:
     redirect_title: Union[str, None] = None
     revision_id: str = ""
 
-    _fields = ["page_id", "title", "timestamp", "redirect_title", "revision_id", "text"]
-
     @classmethod
     def get_avro_schema(cls, ignored_fields=None, fields=None) -> dict:
         schema = {
@@ -83,40 +184,93 @@ class Page:
         return schema
 
     def to_dict(self) -> dict:
-        return asdict(self)
+        # Built by hand, as dataclasses.asdict deep-copies every field (including
+        # the text).
+        return {
+            "page_id": self.page_id,
+            "title": self.title,
+            "timestamp": self.timestamp,
+            "redirect_title": self.redirect_title,
+            "revision_id": self.revision_id,
+            "text": self.text,
+        }
+
+    def to_avro_record(self) -> dict:
+        """Return the page as a dict, with the timestamp as an ISO string.
+
+        The timestamp is a string in the Avro schema (see ``get_avro_schema``).
+        """
+        record = self.to_dict()
+        if isinstance(self.timestamp, datetime):
+            record["timestamp"] = self.timestamp.isoformat()
+        return record
 
     @classmethod
     def from_xml(cls, elem: etree.Element, namespace: str) -> "Page":
-        redirect_elem = elem.find(f"./{{{namespace}}}redirect")
-        redirect_title = (
-            redirect_elem.get("title") if redirect_elem is not None else None
-        )
-        timestamp = elem.find(f".//{{{namespace}}}timestamp").text
-        revision = elem.find(f".//{{{namespace}}}revision")
-        if revision is not None:
-            revision_id = revision.find(f"./{{{namespace}}}id")
-            if revision_id is not None:
-                revision_id = revision_id.text
-        return cls(
-            page_id=int(elem.find(f"./{{{namespace}}}id").text),
-            title=elem.find(f"./{{{namespace}}}title").text,
-            timestamp=datetime.strptime(timestamp, "%Y-%m-%dT%H:%M:%SZ"),
-            redirect_title=redirect_title,
-            revision_id=revision_id,
-            text=elem.find(f".//{{{namespace}}}text").text,
-        )
+        fields = _read_page_fields(elem, _get_page_tags(namespace))
+        fields["timestamp"] = _parse_timestamp(fields["timestamp"])
+        return cls(**fields)
 
     def get_wikipedia_url(self) -> str:
         return f"https://en.wikipedia.org/wiki/{self.title}"
 
 
+def _index_entry(block_start: int, ordinal: int) -> bytes:
+    """Return the title index entry of the ordinal-th record of an Avro block."""
+    return f"{block_start}:{ordinal}".encode("utf-8")
+
+
+def _get_block_index_entries(titles: List[str], block_start: int) -> List[tuple]:
+    """Return the (title, index entry) pairs of the records of an Avro block."""
+    return [
+        (title.encode("utf-8"), _index_entry(block_start, ordinal))
+        for ordinal, title in enumerate(titles)
+    ]
+
+
+def _read_long(fo) -> int:
+    """Read an integer encoded as in the Avro format (zigzag varint)."""
+    shift = result = 0
+    while True:
+        byte = fo.read(1)[0]
+        result |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return (result >> 1) ^ -(result & 1)
+        shift += 7
+
+
+def _read_avro_block_record(
+    avro_reader, avro_schema, block_start: int, ordinal: int
+) -> dict:
+    """Return the ordinal-th record of the Avro block starting at block_start.
+
+    The block is read and decoded directly (the fastavro readers can't jump to
+    a block), so this reads only one block of the file. ``avro_schema`` is the
+    parsed writer schema of the file, see ``fastavro.parse_schema``.
+    """
+    fo = avro_reader.fo
+    fo.seek(block_start)
+    _read_long(fo)  # number of records in the block
+    codec = avro_reader.metadata.get("avro.codec", "null")
+    # Reads the (size-prefixed) block data and decompresses it.
+    block = BLOCK_READERS[codec](fo)
+    for _ in range(ordinal + 1):
+        record = fastavro.schemaless_reader(block, avro_schema, None)
+    return record
+
+
 class ExtractorBase(ABC):
     @abstractmethod
-    def _iter_pages(self) -> Iterator[Page]:
+    def _iter_pages(
+        self, page_prefilter: Optional[Callable[[str, int, bool], bool]] = None
+    ) -> Iterator[Page]:
         """Iterate over all pages in the dump file.
 
         The returned elements are Page objects with fields title, page_id,
         timestamp, redirect_title, revision_id, and text.
+
+        Pages for which ``page_prefilter(title, page_id, is_redirect)`` returns
+        False are skipped before the Page object is built.
         """
         raise NotImplementedError
 
@@ -124,25 +278,29 @@ class ExtractorBase(ABC):
         self,
         page_limit: Optional[int] = None,
         page_filter: Optional[Callable[[Page], bool]] = None,
+        page_prefilter: Optional[Callable[[str, int, bool], bool]] = None,
     ) -> Iterator[Page]:
         """Iterate over all pages in the dump file.
 
         The returned elements are Page objects with fields title, page_id,
         timestamp, redirect_title, revision_id, and text.
+
+        ``page_prefilter`` is like ``page_filter``, but it is called with only
+        the title, ID and redirect status of the page, before the rest of the
+        page (including its text) is read. Use it for filters that don't need
+        the page text, as the skipped pages are much cheaper.
         """
-        page_count = 0
-        for page in self._iter_pages():
-            if page_filter is None or page_filter(page):
-                yield page
-                page_count += 1
-                if page_limit is not None and page_count >= page_limit:
-                    break
+        pages = self._iter_pages(page_prefilter=page_prefilter)
+        if page_filter is not None:
+            pages = filter(page_filter, pages)
+        yield from itertools.islice(pages, page_limit)
 
     def iter_page_batches(
         self,
         batch_size: int,
         page_limit: Optional[int] = None,
         page_filter: Optional[Callable[[Page], bool]] = None,
+        page_prefilter: Optional[Callable[[str, int, bool], bool]] = None,
     ) -> Iterator[List[Page]]:
         """Iterate over pages in batches.
 
@@ -151,7 +309,7 @@ class ExtractorBase(ABC):
 
         This method iterates over the pages in the dump file and yields batches of
         pages. If a limit is provided, the iteration will stop after the specified
-        number of batches have been returned.
+        number of pages have been returned (the last batch may be smaller).
 
         Parameters
         ----------
@@ -162,22 +320,58 @@ class ExtractorBase(ABC):
         page_filter : Callable[[Page], bool], optional
             A function that takes a Page object and returns a boolean.
             If the function returns False, the page will not be included in the batch.
+        page_prefilter : Callable[[str, int, bool], bool], optional
+            A function that takes the title, ID and redirect status (True for
+            redirects) of a page and returns a boolean. If it returns False,
+            the page is skipped before its text is read.
 
         Returns
         -------
         Iterator[list[Page]]
             An iterator over lists of pages.
         """
-        batch = []
-        batches_returned = 0
-        for page in self.iter_pages(page_limit=page_limit, page_filter=page_filter):
-            batch.append(page)
-            if len(batch) >= batch_size:
-                yield batch
-                batches_returned += 1
-                batch = []
-        if batch:
-            yield batch
+        pages = self.iter_pages(
+            page_limit=page_limit,
+            page_filter=page_filter,
+            page_prefilter=page_prefilter,
+        )
+        yield from iter(lambda: list(itertools.islice(pages, batch_size)), [])
+
+    def iter_page_column_batches(
+        self,
+        batch_size: int,
+        page_limit: Optional[int] = None,
+        page_prefilter: Optional[Callable[[str, int, bool], bool]] = None,
+    ) -> Iterator[dict]:
+        """Iterate over pages in batches of columns.
+
+        Each return is a dict with one list per page field (page_id, title,
+        timestamp, redirect_title, revision_id, text), with the timestamps as
+        strings like in ``Page.to_avro_record``. The pages are read without building
+        Page objects, and a batch can be turned directly into a table, e.g.
+        with ``pyarrow.RecordBatch.from_pydict`` or ``pandas.DataFrame``.
+
+        Parameters
+        ----------
+        batch_size : int
+            The number of pages per batch.
+        page_limit : int | None, optional
+            The maximum number of pages to return.
+        page_prefilter : Callable[[str, int, bool], bool], optional
+            A function that takes the title, ID and redirect status (True for
+            redirects) of a page and returns a boolean. If it returns False,
+            the page is skipped before its text is read.
+
+        Returns
+        -------
+        Iterator[dict[str, list]]
+            An iterator over dicts of columns.
+        """
+        records = itertools.islice(
+            self._iter_page_records(page_prefilter=page_prefilter), page_limit
+        )
+        for batch in iter(lambda: list(itertools.islice(records, batch_size)), []):
+            yield {name: [record[name] for record in batch] for name in batch[0]}
 
     async def process_pages_async(
         self,
@@ -250,6 +444,8 @@ class ExtractorBase(ABC):
         page_limit: int = None,
         codec: str = "zstandard",
         page_filter: Optional[Callable[[Page], bool]] = None,
+        page_prefilter: Optional[Callable[[str, int, bool], bool]] = None,
+        index_dir: Optional[Union[str, Path]] = None,
     ):
         """Convert the XML dump file to an Avro file.
 
@@ -270,6 +466,15 @@ class ExtractorBase(ABC):
         page_filter : Callable[[Page], bool], optional
             A function that takes a Page object and returns a boolean.
             If the function returns False, the page will not be included in the Avro file.
+        page_prefilter : Callable[[str, int, bool], bool], optional
+            A function that takes the title, ID and redirect status of a page and
+            returns a boolean. If it returns False, the page is skipped before
+            its text is read (and is not stored in the redirects database).
+        index_dir : str | Path, optional
+            Path where to save the title index of the Avro file (an LMDB
+            database, as created by ``WikiAvroDumpExtractor.index_pages``). The
+            index is built while writing, which saves reading the whole Avro
+            file again to index it.
         """
         target_path = Path(output_file)
         if target_path.exists():
@@ -282,37 +487,106 @@ class ExtractorBase(ABC):
             if redirects_db_path.exists():
                 shutil.rmtree(redirects_db_path)
             redirects_env = lmdb.open(str(redirects_db_path), map_size=10 * 1024 * 1024 * 1024)
+        index_env = None
+        if index_dir is not None:
+            index_dir = Path(index_dir)
+            if index_dir.exists():
+                shutil.rmtree(index_dir)
+            index_env = lmdb.open(str(index_dir), map_size=10 * 1024 * 1024 * 1024)
 
         schema = Page.get_avro_schema(ignored_fields=ignored_fields, fields=fields)
-        
+
         try:
             with target_path.open("a+b") as f:
-                batches = self.iter_page_batches(
-                    batch_size=batch_size, page_limit=page_limit
+                writer = fastavro.write.Writer(f, schema, codec=codec)
+                # Titles of the records not yet written to the file by the writer.
+                # They will be in the block starting at the current file position.
+                pending_titles = []
+                records_and_flags = self._iter_records_for_avro(
+                    page_limit=page_limit,
+                    page_filter=page_filter,
+                    page_prefilter=page_prefilter,
+                )
+                batches = iter(
+                    lambda: list(itertools.islice(records_and_flags, batch_size)), []
                 )
                 total = None if page_limit is None else page_limit // batch_size
                 for batch in tqdm(batches, total=total):
+                    redirects = []
+                    index_entries = []
+                    for record, is_kept in batch:
+                        if redirects_env is not None:
+                            # Redirects go to LMDB instead of the Avro file
+                            if record["redirect_title"] is not None:
+                                redirects.append(
+                                    (
+                                        record["title"].encode("utf-8"),
+                                        record["redirect_title"].encode("utf-8"),
+                                    )
+                                )
+                                continue
+                            if not record["text"]:
+                                continue
+                        if not is_kept:
+                            continue
+                        block_start = f.tell()
+                        writer.write(record)
+                        pending_titles.append(record["title"])
+                        if f.tell() != block_start:
+                            # The writer just wrote a block with these records.
+                            index_entries += _get_block_index_entries(
+                                pending_titles, block_start
+                            )
+                            pending_titles = []
                     if redirects_env is not None:
-                        # Store redirects in LMDB
                         with redirects_env.begin(write=True) as txn:
-                            for page in batch:
-                                if page.redirect_title is not None:
-                                    txn.put(
-                                        page.title.encode("utf-8"),
-                                        page.redirect_title.encode("utf-8")
-                                    )
-                        # Filter out redirects from the main batch
-                        batch = [p for p in batch if p.redirect_title is None and p.text]
-                    
-                    records = [
-                        page.to_dict()
-                        for page in batch
-                        if page_filter is None or page_filter(page)
-                    ]
-                    fastavro.writer(f, schema, records, codec=codec)
+                            txn.cursor().putmulti(redirects)
+                    if index_env is not None:
+                        self._write_index_entries(index_env, index_entries)
+                block_start = f.tell()
+                writer.flush()
+                if index_env is not None:
+                    self._write_index_entries(
+                        index_env, _get_block_index_entries(pending_titles, block_start)
+                    )
         finally:
             if redirects_env is not None:
                 redirects_env.close()
+            if index_env is not None:
+                index_env.close()
+
+    @staticmethod
+    def _write_index_entries(index_env, index_entries):
+        """Store the (title, index entry) pairs in the index database."""
+        with index_env.begin(write=True) as txn:
+            txn.cursor().putmulti(index_entries)
+
+    def _iter_records_for_avro(self, page_limit, page_filter, page_prefilter):
+        """Yield (record, passes page_filter) for the pages of the dump.
+
+        Without page_filter, no Page objects are needed, and the records come
+        straight from ``_iter_page_records``.
+        """
+        if page_filter is None:
+            records = self._iter_page_records(page_prefilter=page_prefilter)
+            for record in itertools.islice(records, page_limit):
+                yield record, True
+        else:
+            pages = self._iter_pages(page_prefilter=page_prefilter)
+            for page in itertools.islice(pages, page_limit):
+                yield page.to_avro_record(), page_filter(page)
+
+    def _iter_page_records(
+        self, page_prefilter: Optional[Callable[[str, int, bool], bool]] = None
+    ) -> Iterator[dict]:
+        """Iterate over all pages in the dump file, as Avro records (dicts).
+
+        See ``Page.to_avro_record``.
+
+        Extractors can override this to build the dicts without Page objects.
+        """
+        for page in self._iter_pages(page_prefilter=page_prefilter):
+            yield page.to_avro_record()
 
     def extract_disambiguation_page_titles(
         self, output_file: Union[str, Path], page_limit: int = None
@@ -357,6 +631,100 @@ class ExtractorBase(ABC):
                 json.dump(pages_in_category, f)
         return pages_in_category
 
+
+def _get_parallel_bzip2_command() -> Optional[str]:
+    """Return the path of the lbzip2 or pbzip2 command, if installed."""
+    for command in ["lbzip2", "pbzip2"]:
+        path = shutil.which(command)
+        if path is not None:
+            return path
+    return None
+
+
+class _ThreadedReader:
+    """Read-only file object reading a file by chunks in a background thread.
+
+    Used to decompress .bz2 files (the bz2 module releases the GIL while it
+    decompresses) while the XML parser reads the chunks already decompressed.
+
+    Parameters
+    ----------
+    open_file : Callable[[], file object]
+        Function opening the file to read (called in the background thread).
+    chunk_size : int
+        Size of the chunks read in the background thread.
+    max_chunks : int
+        Maximal number of chunks read in advance.
+    """
+
+    def __init__(self, open_file: Callable, chunk_size: int, max_chunks: int = 2):
+        self._queue = queue.Queue(maxsize=max_chunks)
+        self._stopped = threading.Event()
+        self._chunk = b""
+        self._position = 0
+        self._at_end = False
+        self._thread = threading.Thread(
+            target=self._read_chunks, args=(open_file, chunk_size), daemon=True
+        )
+        self._thread.start()
+
+    def _read_chunks(self, open_file, chunk_size):
+        try:
+            with open_file() as f:
+                while not self._stopped.is_set():
+                    chunk = f.read(chunk_size)
+                    self._put(chunk)
+                    if not chunk:
+                        return
+        except Exception as error:
+            # Raised in the reading thread by read().
+            self._put(error)
+
+    def _put(self, item):
+        while not self._stopped.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+    def read(self, size: int = -1) -> bytes:
+        if size < 0:
+            return b"".join(iter(lambda: self.read(1 << 20), b""))
+        if self._position == len(self._chunk):
+            if self._at_end:
+                return b""
+            item = self._queue.get()
+            if isinstance(item, Exception):
+                raise item
+            self._chunk, self._position = item, 0
+            self._at_end = not item
+        data = self._chunk[self._position : self._position + size]
+        self._position += len(data)
+        return data
+
+    def close(self):
+        self._stopped.set()
+        self._thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+# Options of the XML parser for the page elements. Page texts can be longer than
+# the 10MB that libxml2 accepts by default, the dumps have no IDs nor custom
+# entities, and recover keeps the pages read so far in truncated dumps.
+_XML_PARSER_OPTIONS = {
+    "recover": True,
+    "huge_tree": True,
+    "collect_ids": False,
+    "resolve_entities": False,
+}
+
+
 class WikiXmlDumpExtractor(ExtractorBase):
     """A class for extracting pages from a MediaWiki XML dump file.
     This class provides functionality to parse and extract pages from MediaWiki XML
@@ -364,10 +732,18 @@ class WikiXmlDumpExtractor(ExtractorBase):
     (.xml.bz2). It handles the XML namespace detection automatically and provides
     iterators for processing pages individuallyor in batches.
 
+    Dumps can also be zstandard compressed (.xml.zst, see ``transcode_to_zstd``).
+    These are a bit larger than the .xml.bz2 dumps but decompress many times
+    faster, which is worth it when a dump is read several times.
+
     Parameters
     ----------
     file_path : str | Path
-        Path to the MediaWiki XML dump file (.xml or .xml.bz2)
+        Path to the MediaWiki XML dump file (.xml, .xml.bz2 or .xml.zst)
+    namespace : str | None, optional
+        XML namespace of the dump, e.g. "http://www.mediawiki.org/xml/export-0.11/".
+        If not provided, it is detected from the start of the file, which for
+        .xml.bz2 dumps means decompressing their first block.
 
     Examples
     --------
@@ -380,19 +756,102 @@ class WikiXmlDumpExtractor(ExtractorBase):
     ...     process_batch(batch)
     """
 
-    def __init__(self, file_path: Union[str, Path]):
+    # Size of the chunks read from the file by the XML parser. Large chunks mean
+    # fewer calls to the decompressor and to the parser.
+    XML_READ_BUFFER = 1 << 20
+
+    # Size of the chunks decompressed in advance (in a background thread) when
+    # the .bz2 files are decompressed with the bz2 module.
+    XML_DECOMPRESSION_CHUNK = 4 << 20
+
+    def __init__(self, file_path: Union[str, Path], namespace: Optional[str] = None):
         self.file_path = Path(file_path)
-        self.namespace = self._detect_namespace()
+        if namespace is None:
+            namespace = self._detect_namespace()
+        self.namespace = namespace
 
+    @contextmanager
     def _get_xml_handle(self):
-        """Return a handle to the XML file (handle both .xml and .xml.bz2)"""
+        """Return a handle to the XML file (handle .xml, .xml.bz2 and .xml.zst)
+
+        The .xml.bz2 files are decompressed on all cores with indexed_bzip2 if
+        installed, else with the lbzip2 or pbzip2 command if available, else
+        with the (single-threaded) bz2 module.
+        """
         suffix = self.file_path.suffix
         if suffix == ".xml":
-            return open(self.file_path, "rb")
+            with open(self.file_path, "rb", buffering=self.XML_READ_BUFFER) as f:
+                if hasattr(os, "posix_fadvise"):
+                    # Let the OS read ahead more of the file while we parse.
+                    os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+                yield f
         elif suffix == ".bz2" and self.file_path.stem.endswith(".xml"):
-            return bz2.open(self.file_path, "rb")
+            if indexed_bzip2 is not None:
+                with indexed_bzip2.open(
+                    str(self.file_path), parallelization=os.cpu_count()
+                ) as f:
+                    yield f
+            elif _get_parallel_bzip2_command() is not None:
+                with self._decompress_in_subprocess() as f:
+                    yield f
+            else:
+                # bz2.open reads by chunks of 8kB, hence the larger buffer.
+                def open_file():
+                    return io.BufferedReader(
+                        bz2.BZ2File(self.file_path, "rb"),
+                        buffer_size=self.XML_READ_BUFFER,
+                    )
+
+                if (os.cpu_count() or 1) > 1:
+                    # Decompress in a background thread while the parser reads
+                    # (on a single core, the two threads would only compete).
+                    chunk_size = self.XML_DECOMPRESSION_CHUNK
+                    with _ThreadedReader(open_file, chunk_size) as f:
+                        yield f
+                else:
+                    with open_file() as f:
+                        yield f
+        elif suffix == ".zst" and self.file_path.stem.endswith(".xml"):
+            with open(self.file_path, "rb") as raw_file:
+                decompressor = zstandard.ZstdDecompressor()
+                with decompressor.stream_reader(raw_file) as f:
+                    yield f
         else:
-            raise ValueError(f"Unsupported file type: {self.file_path}. Expected .xml or .xml.bz2 file")
+            raise ValueError(
+                f"Unsupported file type: {self.file_path}. "
+                "Expected .xml, .xml.bz2 or .xml.zst file"
+            )
+
+    @contextmanager
+    def _decompress_in_subprocess(self):
+        """Yield the output of a parallel bzip2 command decompressing the file.
+
+        Raises
+        ------
+        OSError
+            If the output was read to the end but the command failed (e.g. on a
+            corrupt file), as the XML parser would silently stop at the error.
+        """
+        command = [_get_parallel_bzip2_command(), "-dc", str(self.file_path)]
+        process = subprocess.Popen(
+            command, stdout=subprocess.PIPE, bufsize=self.XML_READ_BUFFER
+        )
+        stopped_early = True
+        try:
+            yield process.stdout
+            stopped_early = bool(process.stdout.peek(1))
+        finally:
+            process.stdout.close()
+            if stopped_early:
+                # The reading stopped before the end of the file (e.g. to detect
+                # the namespace), so the command may still be running.
+                process.kill()
+            return_code = process.wait()
+        if not stopped_early and return_code != 0:
+            raise OSError(
+                f"{command[0]} failed to decompress {self.file_path} "
+                f"(exit code {return_code})"
+            )
 
     def _detect_namespace(self) -> str:
         """Detect the namespace of the XML file
@@ -406,22 +865,161 @@ class WikiXmlDumpExtractor(ExtractorBase):
         """Iterate over all XML elements tagged as pages in the dump file"""
         tag = f"{{{self.namespace}}}page"
         with self._get_xml_handle() as f:
-            for _, elem in etree.iterparse(f, events=("end",), tag=tag, recover=True):
+            elements = etree.iterparse(
+                f, events=("end",), tag=tag, **_XML_PARSER_OPTIONS
+            )
+            for _, elem in elements:
                 yield elem
                 self._clean_up_xml_page_element(elem)
 
     def _clean_up_xml_page_element(self, page_xml: etree.Element):
         """Clean up the XML element. This is critical to avoid memory leaks."""
         page_xml.clear()
-        while page_xml.getprevious() is not None:
-            del page_xml.getparent()[0]
-
-    def _iter_pages(self):
-        for i, page_xml in enumerate(self._iter_xml_page_elements()):
+        # The previous siblings (already processed) are deleted in one slice.
+        parent = page_xml.getparent()
+        if parent is not None:
+            del parent[: parent.index(page_xml)]
+
+    def _iter_prefiltered_page_elements(self, page_prefilter=None):
+        tags = _get_page_tags(self.namespace)
+        for page_xml in self._iter_xml_page_elements():
+            if page_prefilter is not None:
+                if not page_prefilter(*_read_page_header(page_xml, tags)):
+                    continue
+            yield page_xml
+
+    def _iter_pages(self, page_prefilter=None):
+        for page_xml in self._iter_prefiltered_page_elements(page_prefilter):
             yield Page.from_xml(page_xml, self.namespace)
 
+    def _iter_page_records(self, page_prefilter=None):
+        """Iterate over the pages as dicts, without building Page objects."""
+        tags = _get_page_tags(self.namespace)
+        for page_xml in self._iter_prefiltered_page_elements(page_prefilter):
+            record = _read_page_fields(page_xml, tags)
+            record["timestamp"] = _timestamp_to_isoformat(record["timestamp"])
+            yield record
+
+    def process_page_batches_in_parallel(
+        self,
+        process_fn: Callable[[List[Page], int], Any],
+        num_workers: int,
+        batch_size: int,
+        page_limit: Optional[int] = None,
+        page_filter: Optional[Callable[[Page], bool]] = None,
+        ordered_results: bool = False,
+    ):
+        """Apply a function to each batch of pages in parallel.
+
+        Without page limit or filter, the workers parse the XML of the pages
+        themselves, which spreads the XML parsing over the workers. For
+        uncompressed .xml dumps, only the byte range of each batch is sent to
+        the workers, which read it from the file. For .xml.bz2 dumps, the
+        decompressed XML of each batch is sent to the workers. The function is
+        sent once to each worker, so it must be picklable.
+
+        See ``ExtractorBase.process_page_batches_in_parallel`` for the
+        parameters.
+        """
+        if page_limit is not None or page_filter is not None:
+            yield from super().process_page_batches_in_parallel(
+                process_fn=process_fn,
+                num_workers=num_workers,
+                batch_size=batch_size,
+                page_limit=page_limit,
+                page_filter=page_filter,
+                ordered_results=ordered_results,
+            )
+            return
+        if self.file_path.suffix == ".xml":
+            file_path = self.file_path
+            xml_ranges = self._iter_page_batch_ranges(batch_size)
+        else:
+            file_path = None
+            xml_ranges = self._iter_page_batch_bytes(batch_size)
+        tasks = ((xml_range, index) for index, xml_range in enumerate(xml_ranges))
+        with multiprocessing.Pool(
+            num_workers,
+            initializer=_init_page_range_worker,
+            initargs=(file_path, self.namespace, process_fn),
+        ) as pool:
+            imap = pool.imap if ordered_results else pool.imap_unordered
+            for batch_result in imap(_process_page_range, tasks):
+                yield batch_result
+
+    def _iter_page_batch_ranges(self, batch_size: int) -> Iterator[Tuple[int, int]]:
+        """Yield the (start, end) byte ranges of the batches of pages of an
+        uncompressed XML dump. The page texts are escaped in the XML, so every
+        "<page>" in the file is the start of a page."""
+        with open(self.file_path, "rb") as f, mmap.mmap(
+            f.fileno(), 0, access=mmap.ACCESS_READ
+        ) as data:
+            end_of_pages = data.rfind(b"</mediawiki>")
+            start = data.find(b"<page>")
+            while start != -1:
+                next_start = start
+                for _ in range(batch_size):
+                    next_start = data.find(b"<page>", next_start + 1)
+                    if next_start == -1:
+                        break
+                yield start, end_of_pages if next_start == -1 else next_start
+                start = next_start
+
+    def _iter_page_batch_bytes(self, batch_size: int) -> Iterator[bytes]:
+        """Yield the XML of the batches of pages of the dump, as decompressed
+        bytes cut before each batch's first "<page>"."""
+        data = bytearray()
+        page_starts = []
+        with self._get_xml_handle() as f:
+            for chunk in iter(lambda: f.read(self.XML_READ_BUFFER), b""):
+                # A "<page>" can straddle two chunks.
+                search_start = max(0, len(data) - len(b"<page>") + 1)
+                data += chunk
+                position = data.find(b"<page>", search_start)
+                while position != -1:
+                    page_starts.append(position)
+                    position = data.find(b"<page>", position + 1)
+                if not page_starts:
+                    del data[:search_start]
+                    continue
+                if page_starts[0] > 0:
+                    # Drop what comes before the first page (e.g. the siteinfo).
+                    del data[: page_starts[0]]
+                    page_starts = [start - page_starts[0] for start in page_starts]
+                while len(page_starts) > batch_size:
+                    end = page_starts[batch_size]
+                    yield bytes(data[:end])
+                    del data[:end]
+                    page_starts = [start - end for start in page_starts[batch_size:]]
+        if page_starts:
+            yield bytes(data[: data.rfind(b"</mediawiki>")])
+
+    def transcode_to_zstd(self, output_file: Union[str, Path], level: int = 3):
+        """Write the dump as a zstandard compressed .xml.zst file.
+
+        The .xml.zst dump can then be read with ``WikiXmlDumpExtractor`` much
+        faster than the original .xml.bz2 dump, as the decompression (which is
+        the slowest part of reading .xml.bz2 dumps) is many times faster.
+
+        Parameters
+        ----------
+        output_file : str | Path
+            Path where to save the .xml.zst file.
+        level : int, optional
+            Zstandard compression level, by default 3. Higher levels give
+            smaller files but are slower to write (not to read).
+        """
+        compressor = zstandard.ZstdCompressor(level=level, threads=-1)
+        with self._get_xml_handle() as source, open(output_file, "wb") as f:
+            with compressor.stream_writer(f, closefd=False) as writer:
+                for chunk in iter(lambda: source.read(self.XML_READ_BUFFER), b""):
+                    writer.write(chunk)
+
     def extract_pages_to_new_xml(
-        self, output_file: Union[str, Path], limit: Union[int, None] = 50
+        self,
+        output_file: Union[str, Path],
+        limit: Union[int, None] = 50,
+        compresslevel: int = 9,
     ):
         """Create a smaller XML dump file by extracting a limited number of pages.
 
@@ -430,34 +1028,120 @@ class WikiXmlDumpExtractor(ExtractorBase):
         Parameters
         ----------
         output_file : str | Path
-            Path where to save the output XML file. Can be a .xml or .xml.bz2 file.
-        page_limit : int, optional
-            Maximum number of pages to extract, by default 70
+            Path where to save the output XML file. Can be a .xml, .xml.bz2 or
+            .xml.zst file.
+        limit : int | None, optional
+            Maximum number of pages to extract (all pages if None), by default 50
+        compresslevel : int, optional
+            Compression level of .xml.bz2 files (1-9), by default 9. For .xml.zst
+            files (much faster to write and read), zstandard's level 3 is used.
         """
         output_file = Path(output_file)
-        new_root = etree.Element("mediawiki", nsmap={None: self.namespace})
-        new_root.set("version", "0.11")
-        for i, elem in enumerate(self._iter_xml_page_elements()):
-            if i >= limit:
-                break
-            new_root.append(deepcopy(elem))
-
-        tree = etree.ElementTree(new_root)
         if output_file.suffix.endswith(".bz2"):
-            with bz2.open(output_file, "wb") as f:
-                tree.write(f, pretty_print=True, encoding="utf-8", xml_declaration=True)
+            f = bz2.open(output_file, "wb", compresslevel=compresslevel)
+        elif output_file.suffix.endswith(".zst"):
+            f = zstandard.open(output_file, "wb")
         else:
-            tree.write(
-                output_file, pretty_print=True, encoding="utf-8", xml_declaration=True
-            )
+            f = open(output_file, "wb")
+        # The pages are written as they are read, without building a new tree.
+        # Serialized alone, each page would re-declare the namespace of the root.
+        xmlns = f' xmlns="{self.namespace}"'.encode()
+        with f:
+            f.write(b"<?xml version='1.0' encoding='UTF-8'?>\n")
+            f.write(b"<mediawiki" + xmlns + b' version="0.11">\n  ')
+            pages = self._iter_xml_page_elements()
+            for elem in itertools.islice(pages, limit):
+                page = etree.tostring(elem, encoding="utf-8", xml_declaration=False)
+                f.write(page.replace(xmlns, b"", 1))
+            f.write(b"</mediawiki>\n")
+
+
+# State of the workers of WikiXmlDumpExtractor.process_page_batches_in_parallel,
+# set once per worker by _init_page_range_worker.
+_page_range_worker = {}
+
+
+def _init_page_range_worker(file_path, namespace, process_fn):
+    # Workers only get bytes (no file) for compressed dumps.
+    if file_path is not None:
+        _page_range_worker["file"] = open(file_path, "rb")
+    _page_range_worker["namespace"] = namespace
+    _page_range_worker["process_fn"] = process_fn
+    _page_range_worker["parser"] = etree.XMLParser(**_XML_PARSER_OPTIONS)
+
+
+def _process_page_range(task):
+    """Parse the pages in a byte range of the XML dump (or in the XML bytes
+    of the pages) and process them."""
+    xml_range, index = task
+    if isinstance(xml_range, bytes):
+        data = xml_range
+    else:
+        start, end = xml_range
+        f = _page_range_worker["file"]
+        f.seek(start)
+        data = f.read(end - start)
+    namespace = _page_range_worker["namespace"]
+    root = etree.fromstring(
+        f'<mediawiki xmlns="{namespace}">'.encode() + data + b"</mediawiki>",
+        _page_range_worker["parser"],
+    )
+    pages = [
+        Page.from_xml(elem, namespace)
+        for elem in root.iterchildren(tag=f"{{{namespace}}}page")
+    ]
+    return _page_range_worker["process_fn"]((pages, index))
 
 
 class WikiAvroDumpExtractor(ExtractorBase):
     def __init__(self, file_path: str, index_dir: Optional[Union[str, Path]] = None):
         self.file_path = file_path
         self.index_dir = index_dir
+        # Index transaction and Avro reader kept open in a ``with`` block.
+        self._lookup = None
+        self._lookup_stack = None
+
+    def __enter__(self):
+        """Keep the index and the Avro file open for the title lookups.
+
+        Without this, each call to ``get_page_by_title`` (and other lookups)
+        opens the index and the Avro file again.
+
+        Examples
+        --------
+        >>> with WikiAvroDumpExtractor("dump.avro", index_dir="index") as dump:
+        ...     for title in titles:
+        ...         page = dump.get_page_by_title(title)
+        """
+        with ExitStack() as stack:
+            lookup = stack.enter_context(self._open_lookup())
+            self._lookup_stack = stack.pop_all()
+        self._lookup = lookup
+        return self
+
+    def __exit__(self, *args):
+        self._lookup = None
+        self._lookup_stack.close()
+
+    @contextmanager
+    def _open_lookup(self):
+        """Yield the index transaction, the Avro reader and its parsed schema.
+
+        The schema is parsed once here, else each lookup would parse it again.
+        """
+        if self._lookup is not None:
+            yield self._lookup
+            return
+        env = self._open_index()
+        try:
+            with env.begin() as txn, open(self.file_path, "rb") as f:
+                reader = fastavro.reader(f)
+                next(reader)
+                yield txn, reader, fastavro.parse_schema(reader.writer_schema)
+        finally:
+            env.close()
 
-    def _iter_pages(self) -> Iterator[Page]:
+    def _iter_pages(self, page_prefilter=None) -> Iterator[Page]:
         """Iterate over all pages in the Avro file.
 
         The returned elements are Page objects with fields title, page_id,
@@ -467,6 +1151,12 @@ class WikiAvroDumpExtractor(ExtractorBase):
         with open(self.file_path, "rb") as f:
             reader = fastavro.reader(f)
             for record in reader:
+                if page_prefilter is not None and not page_prefilter(
+                    record.get("title"),
+                    record.get("page_id"),
+                    record.get("redirect_title") is not None,
+                ):
+                    continue
                 yield Page(**record)
 
     def index_pages(self, index_dir: Union[str, Path]):
@@ -484,26 +1174,40 @@ class WikiAvroDumpExtractor(ExtractorBase):
         # Create LMDB environment with generous map size (10GB)
         env = lmdb.open(str(index_dir), map_size=10 * 1024 * 1024 * 1024)
         
+        def iter_index_entries(blocks):
+            # Each title is indexed by the position of its block in the file and
+            # its position in the block, see _get_page_using_index.
+            for block in tqdm(blocks):
+                for ordinal, record in enumerate(block):
+                    yield (
+                        record["title"].encode("utf-8"),
+                        _index_entry(block.offset, ordinal),
+                    )
+
         with env.begin(write=True) as txn:
             with open(self.file_path, "rb") as f:
-                reader = fastavro.reader(f)
-                previous_idx = reader.fo.tell()
-                idx_to_log = previous_idx
-                for record in tqdm(reader):
-                    new_idx = reader.fo.tell()
-                    if new_idx != previous_idx:
-                        idx_to_log = previous_idx
-                    txn.put(
-                        record["title"].encode("utf-8"), 
-                        str(idx_to_log).encode("utf-8")
-                    )
-                    previous_idx = new_idx
+                # putmulti inserts all the entries in a single call.
+                txn.cursor().putmulti(iter_index_entries(fastavro.block_reader(f)))
         env.close()
         self.index_dir = index_dir
 
+    def _open_index(self) -> lmdb.Environment:
+        """Open the title index for reading.
+
+        The index isn't modified after index_pages, so the readers don't need
+        the lock file, and the random lookups don't benefit from readahead.
+        """
+        return lmdb.open(
+            str(self.index_dir), readonly=True, lock=False, readahead=False
+        )
+
     @classmethod
     def _get_page_using_index(
-        cls, title: str, txn: lmdb.Transaction, avro_reader: fastavro.reader
+        cls,
+        title: str,
+        txn: lmdb.Transaction,
+        avro_reader: fastavro.reader,
+        avro_schema: Optional[dict] = None,
     ) -> Optional[Page]:
         """Get a page by its title using the index.
 
@@ -515,6 +1219,9 @@ class WikiAvroDumpExtractor(ExtractorBase):
             The LMDB transaction to use for reading.
         avro_reader : fastavro.reader
             The Avro reader to use for reading pages.
+        avro_schema : dict, optional
+            The parsed writer schema of the Avro file. Parsed from the reader
+            if not provided.
 
         Returns
         -------
@@ -524,11 +1231,21 @@ class WikiAvroDumpExtractor(ExtractorBase):
         entry = txn.get(title.encode("utf-8"))
         if entry is None:
             return None
-        idx = int(entry.decode("utf-8"))
-        avro_reader.fo.seek(idx)
-        page = next(avro_reader)
-        while page["title"] != title:
+        entry = entry.decode("utf-8")
+        if ":" in entry:
+            # "block_start:ordinal", the page is read directly in its block.
+            block_start, ordinal = map(int, entry.split(":"))
+            if avro_schema is None:
+                avro_schema = fastavro.parse_schema(avro_reader.writer_schema)
+            page = _read_avro_block_record(
+                avro_reader, avro_schema, block_start, ordinal
+            )
+        else:
+            # Indexes from older versions only have a position near the block.
+            avro_reader.fo.seek(int(entry))
             page = next(avro_reader)
+            while page["title"] != title:
+                page = next(avro_reader)
         assert page["title"] == title
         return Page(**page)
 
@@ -560,30 +1277,22 @@ class WikiAvroDumpExtractor(ExtractorBase):
                         redirected_titles.append(title)
                 titles = redirected_titles
 
-        env = lmdb.open(str(self.index_dir), readonly=True)
-        try:
-            with env.begin() as txn:
-                with open(self.file_path, "rb") as f:
-                    reader = fastavro.reader(f)
-                    next(reader)
-                    pages = [
-                        self._get_page_using_index(title, txn, reader) for title in titles
-                    ]
-                    if not any(p is None for p in pages):
-                        return pages
-
-                    if ignore_titles_not_found:
-                        return [p for p in pages if p is not None]
-                    else:
-                        missing_titles = [
-                            title for title, p in zip(titles, pages) if p is None
-                        ]
-                        raise ValueError(
-                            f"{len(missing_titles)} pages not found in index:"
-                            f"first ones are {missing_titles[:10]}"
-                        )
-        finally:
-            env.close()
+        with self._open_lookup() as (txn, reader, schema):
+            pages = [
+                self._get_page_using_index(title, txn, reader, schema)
+                for title in titles
+            ]
+        if not any(p is None for p in pages):
+            return pages
+
+        if ignore_titles_not_found:
+            return [p for p in pages if p is not None]
+        else:
+            missing_titles = [title for title, p in zip(titles, pages) if p is None]
+            raise ValueError(
+                f"{len(missing_titles)} pages not found in index:"
+                f"first ones are {missing_titles[:10]}"
+            )
 
     def get_page_by_title(self, title: str) -> Page:
         """Get a page by its title.
@@ -603,16 +1312,9 @@ class WikiAvroDumpExtractor(ExtractorBase):
         title : str
             The title of the page to get.
         """
-        env = lmdb.open(str(self.index_dir), readonly=True)
-        try:
-            with env.begin() as txn:
-                with open(self.file_path, "rb") as f:
-                    reader = fastavro.reader(f)
-                    next(reader)
-                    for title in titles:
-                        yield self._get_page_using_index(title, txn, reader)
-        finally:
-            env.close()
+        with self._open_lookup() as (txn, reader, schema):
+            for title in titles:
+                yield self._get_page_using_index(title, txn, reader, schema)
 
     def extract_pages_titles_to_new_dump(
         self,
@@ -649,7 +1351,11 @@ class WikiAvroDumpExtractor(ExtractorBase):
             for i in range(0, len(page_titles), batch_size)
         )
 
+        schema = fastavro.parse_schema(Page.get_avro_schema(fields=["title", "text"]))
         with output_file.open("a+b") as f:
+            # Created at the first non-empty batch, so that the header is only
+            # written (or the existing one read) once.
+            writer = None
             for batch in tqdm(batches):
                 pages = self.get_page_batch_by_title(
                     batch,
@@ -657,5 +1363,8 @@ class WikiAvroDumpExtractor(ExtractorBase):
                     ignore_titles_not_found=ignore_titles_not_found,
                 )
                 if len(pages) > 0:
-                    schema = pages[0].get_avro_schema(fields=["title", "text"])
-                    fastavro.writer(f, schema, [page.to_dict() for page in pages])
+                    if writer is None:
+                        writer = fastavro.write.Writer(f, schema)
+                    for page in pages:
+                        writer.write(page.to_avro_record())
+                    writer.flush()
@@ -1,10 +1,16 @@
 """Tests for the main module."""
 
+from src.wiki_dump_extractor import wiki_dump_extractor
 from src.wiki_dump_extractor.wiki_dump_extractor import (
     WikiXmlDumpExtractor,
     WikiAvroDumpExtractor,
+    _ThreadedReader,
 )
+from datetime import datetime
+import bz2
+import shutil
 import lmdb
+import pytest
 
 
 def test_WikiDumpExtractor():
@@ -12,6 +18,18 @@ def test_WikiDumpExtractor():
     extractor = WikiXmlDumpExtractor("test/data/tiny_dump.xml.bz2")
     assert extractor.namespace == "http://www.mediawiki.org/xml/export-0.11/"
     assert len(list(extractor.iter_pages())) == 70
+    extractor = WikiXmlDumpExtractor(
+        "test/data/tiny_dump.xml.bz2", namespace=extractor.namespace
+    )
+    assert len(list(extractor.iter_pages())) == 70
+
+
+def test_Page_timestamp():
+    """Test that the timestamps are datetimes, and ISO strings in Avro records."""
+    page = next(WikiXmlDumpExtractor("test/data/tiny_dump.xml.bz2").iter_pages())
+    assert isinstance(page.timestamp, datetime)
+    assert page.to_dict()["timestamp"] == page.timestamp
+    assert page.to_avro_record()["timestamp"] == page.timestamp.isoformat()
 
 
 def test_WikiDumpExtractor_extract_pages_to_new_xml(tmp_path):
@@ -24,6 +42,42 @@ def test_WikiDumpExtractor_extract_pages_to_new_xml(tmp_path):
     assert (tmp_path / "tiny_dump_new.xml.bz2").stat().st_size > 100_000
 
 
+def test_WikiXmlDumpExtractor_transcode_to_zstd(tmp_path):
+    """Test reading a dump transcoded from .xml.bz2 to .xml.zst."""
+    extractor = WikiXmlDumpExtractor("test/data/tiny_dump.xml.bz2")
+    extractor.transcode_to_zstd(tmp_path / "tiny_dump.xml.zst")
+    zstd_extractor = WikiXmlDumpExtractor(tmp_path / "tiny_dump.xml.zst")
+    assert zstd_extractor.namespace == extractor.namespace
+    pages = [page.to_dict() for page in zstd_extractor.iter_pages()]
+    assert pages == [page.to_dict() for page in extractor.iter_pages()]
+    extractor.extract_pages_to_new_xml(tmp_path / "tiny_dump_new.xml.zst", limit=20)
+    dump = WikiXmlDumpExtractor(tmp_path / "tiny_dump_new.xml.zst")
+    assert [page.to_dict() for page in dump.iter_pages()] == pages[:20]
+
+
+def test_WikiXmlDumpExtractor_decompress_in_subprocess(tmp_path, monkeypatch):
+    """Test the decompression with a bzip2 command, and its errors."""
+    command = shutil.which("bzip2")
+    if command is None:
+        pytest.skip("bzip2 command not available")
+    monkeypatch.setattr(wiki_dump_extractor, "indexed_bzip2", None)
+    monkeypatch.setattr(
+        wiki_dump_extractor, "_get_parallel_bzip2_command", lambda: command
+    )
+    extractor = WikiXmlDumpExtractor("test/data/tiny_dump.xml.bz2")
+    assert extractor.namespace == "http://www.mediawiki.org/xml/export-0.11/"
+    assert len(list(extractor.iter_pages())) == 70
+
+    # A truncated dump is read up to the error, which is then raised.
+    with bz2.open("test/data/tiny_dump.xml.bz2") as f:
+        data = bz2.compress(f.read(), compresslevel=1)  # blocks of 100kB
+    truncated_path = tmp_path / "truncated_dump.xml.bz2"
+    truncated_path.write_bytes(data[: len(data) // 2])
+    truncated_dump = WikiXmlDumpExtractor(truncated_path, extractor.namespace)
+    with pytest.raises(OSError):
+        list(truncated_dump.iter_pages())
+
+
 def test_WikiXmlDumpExtractor_iter_page_batches():
     """Test the iter_page_batches method."""
     extractor = WikiXmlDumpExtractor("test/data/tiny_dump.xml.bz2")
@@ -33,6 +87,17 @@ def test_WikiXmlDumpExtractor_iter_page_batches():
     assert len(batches[-1]) == 3
 
 
+def test_WikiXmlDumpExtractor_iter_page_column_batches():
+    """Test that the column batches have the same pages as the page batches."""
+    extractor = WikiXmlDumpExtractor("test/data/tiny_dump.xml.bz2")
+    column_batches = list(extractor.iter_page_column_batches(5, page_limit=18))
+    page_batches = list(extractor.iter_page_batches(5, page_limit=18))
+    assert len(column_batches) == 4
+    for columns, pages in zip(column_batches, page_batches):
+        records = [page.to_avro_record() for page in pages]
+        assert columns == {name: [r[name] for r in records] for name in records[0]}
+
+
 def test_WikiXmlDumpExtractor_extract_pages_to_avro(tmp_path):
     """Test the extract_pages_to_avro method."""
     extractor = WikiXmlDumpExtractor("test/data/tiny_dump.xml.bz2")
@@ -77,7 +142,119 @@ def test_WikiXmlDumpExtractor_extract_pages_to_avro(tmp_path):
         index_count = sum(1 for _ in cursor)
         assert index_count > 0
 
-        # Check that indices are valid file positions
-        for _, pos in cursor:
-            assert int(pos.decode("utf-8")) >= 0
+        # Check that indices are valid "block position:record ordinal" entries
+        for _, entry in cursor:
+            block_start, ordinal = entry.decode("utf-8").split(":")
+            assert int(block_start) >= 0 and int(ordinal) >= 0
     env.close()
+
+
+def test_WikiXmlDumpExtractor_iter_pages_with_prefilter():
+    """Test that the prefilter gets the title, ID and redirect status."""
+    extractor = WikiXmlDumpExtractor("test/data/tiny_dump.xml.bz2")
+    pages = list(
+        extractor.iter_pages(
+            page_prefilter=lambda title, page_id, is_redirect: not is_redirect
+        )
+    )
+    assert len(pages) == 6
+    assert all(page.redirect_title is None for page in pages)
+    first_page = next(extractor.iter_pages())
+    pages = extractor.iter_pages(
+        page_prefilter=lambda title, page_id, is_redirect: (
+            (title, page_id) == (first_page.title, first_page.page_id)
+        )
+    )
+    assert [page.title for page in pages] == [first_page.title]
+
+
+def _get_batch_titles(batch_and_index):
+    batch, index = batch_and_index
+    return index, [page.title for page in batch]
+
+
+def test_WikiXmlDumpExtractor_process_page_batches_in_parallel(tmp_path):
+    """Test that the workers parsing the XML of the batches get the same batches."""
+    extractor = WikiXmlDumpExtractor("test/data/tiny_dump.xml.bz2")
+    extractor.extract_pages_to_new_xml(tmp_path / "tiny_dump.xml", limit=70)
+    xml_extractor = WikiXmlDumpExtractor(tmp_path / "tiny_dump.xml")
+    results = xml_extractor.process_page_batches_in_parallel(
+        _get_batch_titles, num_workers=2, batch_size=15, ordered_results=True
+    )
+    expected = [
+        [page.title for page in batch]
+        for batch in extractor.iter_page_batches(batch_size=15)
+    ]
+    assert list(results) == list(enumerate(expected))
+    results = extractor.process_page_batches_in_parallel(
+        _get_batch_titles, num_workers=2, batch_size=15, ordered_results=True
+    )
+    assert list(results) == list(enumerate(expected))
+
+
+def test_WikiXmlDumpExtractor_extract_pages_to_avro_with_index(tmp_path):
+    """Test that the index built while writing is the same as index_pages'."""
+    extractor = WikiXmlDumpExtractor("test/data/tiny_dump.xml.bz2")
+    extractor.extract_pages_to_avro(
+        tmp_path / "tiny_dump.avro",
+        batch_size=10,
+        index_dir=tmp_path / "index",
+        fields=["title", "text"],
+    )
+    dump = WikiAvroDumpExtractor(tmp_path / "tiny_dump.avro")
+    dump.index_pages(tmp_path / "index_from_avro")
+
+    def read_index(index_dir):
+        env = lmdb.open(str(index_dir), readonly=True)
+        with env.begin() as txn:
+            entries = dict(txn.cursor())
+        env.close()
+        return entries
+
+    index = read_index(tmp_path / "index")
+    assert len(index) == 70
+    assert index == read_index(tmp_path / "index_from_avro")
+
+    dump = WikiAvroDumpExtractor(
+        tmp_path / "tiny_dump.avro", index_dir=tmp_path / "index"
+    )
+    titles = [page.title for page in dump.iter_pages()]
+    pages = dump.get_page_batch_by_title(titles[::-1])
+    assert [page.title for page in pages] == titles[::-1]
+    with dump:
+        pages = [dump.get_page_by_title(title) for title in titles[::-1]]
+        assert [page.title for page in pages] == titles[::-1]
+
+
+@pytest.mark.parametrize("codec", ["deflate", "xz", "snappy"])
+def test_WikiAvroDumpExtractor_get_page_by_title_with_codec(tmp_path, codec):
+    """Test that the pages are found in the index with any Avro codec."""
+    if codec == "snappy":
+        pytest.importorskip("cramjam")
+    extractor = WikiXmlDumpExtractor("test/data/tiny_dump.xml.bz2")
+    extractor.extract_pages_to_avro(
+        tmp_path / "tiny_dump.avro",
+        batch_size=10,
+        codec=codec,
+        index_dir=tmp_path / "index",
+        fields=["title", "text"],
+    )
+    dump = WikiAvroDumpExtractor(
+        tmp_path / "tiny_dump.avro", index_dir=tmp_path / "index"
+    )
+    pages = list(dump.iter_pages())
+    assert dump.get_page_by_title(pages[-1].title).text == pages[-1].text
+
+
+def test_ThreadedReader():
+    """Test reading a .bz2 file decompressed in a background thread."""
+    path = "test/data/tiny_dump.xml.bz2"
+    with bz2.open(path) as f:
+        expected = f.read()
+    with _ThreadedReader(lambda: bz2.open(path), chunk_size=10_000) as f:
+        assert b"".join(iter(lambda: f.read(3000), b"")) == expected
+    with _ThreadedReader(lambda: bz2.open(path), chunk_size=10_000) as f:
+        assert f.read(5) == expected[:5]  # closing before the end
+    with _ThreadedReader(lambda: open("not_a_file.bz2"), chunk_size=10_000) as f:
+        with pytest.raises(FileNotFoundError):
+            f.read(5)
@@ -1,6 +1,11 @@
 import pytest
 
-from src.wiki_dump_extractor.date_utils import DateRange, extract_dates
+from src.wiki_dump_extractor.date_utils import (
+    DateRange,
+    extract_dates,
+    has_date_batch,
+    iter_date_matches,
+)
 
 
 @pytest.mark.parametrize(
@@ -54,14 +59,70 @@ def test_parse_string_to_date_range(date, expected):
         # Wikipedia date formats
         ("{{Birth date|1810|03|05}}", "1810/03/05"),
         ("{{Birth date|1810|03|05|deg=y}}", "1810/03/05"),
-        # # SlashDMYMDYFormat
-        # ("1810/03/05", "1810/03/05"),
+        # SlashDMYMDYFormat
+        ("(05/03/1810)", "1810/03/05"),
+        ("(12/25/1810)", "1810/12/25"),
     ],
 )
 def test_extract_dates(text, expected):
-    detected_dates, errors = extract_dates(text)
-    assert len(errors) == 0, errors
-    print(detected_dates)
+    detected_dates = extract_dates(text)
     assert expected in [
         detected_date.date.to_string() for detected_date in detected_dates
     ]
+
+
+def test_extract_dates_does_not_report_overlapping_formats():
+    text = "Born on December 16, 2010 (2010-12-09) and died in 2020."
+    detected_dates = extract_dates(text)
+    assert [(d.format, d.date.to_string()) for d in detected_dates] == [
+        ("MONTH_DAY_YEAR", "2010/12/16"),
+        ("DASH_YMD", "2010/12/09"),
+        ("YEAR", "2020"),
+    ]
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        (
+            "He served from 1 January 1990 to 5 March 1995.",
+            [("DAY_MONTH_YEAR", "1990/01/01"), ("DAY_MONTH_YEAR", "1995/03/05")],
+        ),
+        ("born in 7 December 2012", [("DAY_MONTH_YEAR", "2012/12/07")]),
+        (
+            "c. 12 May 1850, in 1860.",
+            [("DAY_MONTH_YEAR", "1850/05/12"), ("YEAR", "1860")],
+        ),
+    ],
+)
+def test_extract_dates_prefers_full_dates_over_years(text, expected):
+    detected_dates = extract_dates(text)
+    assert [(d.format, d.date.to_string()) for d in detected_dates] == expected
+
+
+def test_detected_date_to_tuple_matches_to_dict():
+    detected_date = extract_dates("Born on 7 December 1812.")[0]
+    date_dict = detected_date.to_dict()
+    assert detected_date.to_tuple() == (
+        tuple(date_dict["date"].values()),
+        date_dict["format"],
+        date_dict["date_str"],
+    )
+
+
+def test_extract_dates_skips_invalid_dates():
+    text = "On 31 February 2000, or {{Birth date|2000|13|01}}, on 1 March 2000."
+    assert [d.date.to_string() for d in extract_dates(text)] == ["2000/03/01"]
+
+
+def test_has_date_batch():
+    texts = ["Born on 7 December 1812.", "No date here.", "On 31 February 2000."]
+    assert has_date_batch(texts) == [True, False, False]
+
+
+def test_iter_date_matches():
+    text = "Born on December 16, 2010 and died in 2020."
+    assert [(name, m.group()) for name, m in iter_date_matches(text)] == [
+        ("MONTH_DAY_YEAR", "December 16, 2010"),
+        ("YEAR", "in 2020."),
+    ]
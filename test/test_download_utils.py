@@ -0,0 +1,67 @@
+"""Tests for the download_utils module."""
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import re
+import threading
+
+import pytest
+from src.wiki_dump_extractor.download_utils import download_file
+
+DATA = bytes(range(256)) * 4000
+
+
+class _FileHandler(BaseHTTPRequestHandler):
+    """Serve DATA, advertising byte ranges, but only honouring them if the
+    server's honour_ranges attribute is True."""
+
+    def log_message(self, *args):
+        pass
+
+    def do_HEAD(self):
+        self.send_response(200)
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("Content-Length", str(len(DATA)))
+        self.end_headers()
+
+    def do_GET(self):
+        match = re.match(r"bytes=(\d+)-(\d+)", self.headers.get("Range", ""))
+        if match and self.server.honour_ranges:
+            start, end = int(match.group(1)), int(match.group(2))
+            body = DATA[start : end + 1]
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{len(DATA)}")
+        else:
+            body = DATA
+            self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture(params=[True, False], ids=["ranges", "no_ranges"])
+def file_url(request):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _FileHandler)
+    server.honour_ranges = request.param
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/dump.xml.bz2"
+    server.shutdown()
+    server.server_close()
+
+
+def test_download_file(file_url, tmp_path):
+    target = tmp_path / "dump.xml.bz2"
+    download_file(file_url, target, n_connections=4, block_size=10_000)
+    assert target.read_bytes() == DATA
+    assert not (tmp_path / "dump.xml.bz2.part").exists()
+
+
+def test_download_file_single_connection(file_url, tmp_path):
+    target = tmp_path / "dump.xml.bz2"
+    download_file(file_url, target, n_connections=1)
+    assert target.read_bytes() == DATA
+
+
+def test_download_file_checks_n_connections(tmp_path):
+    with pytest.raises(ValueError):
+        download_file("http://127.0.0.1/", tmp_path / "dump", n_connections=0)
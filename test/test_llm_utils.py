@@ -0,0 +1,56 @@
+"""Tests for the LLM utilities."""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("pydantic_ai")
+from src.wiki_dump_extractor import llm_utils
+from src.wiki_dump_extractor.llm_utils import _get_agent
+
+
+def test_get_agent_is_cached():
+    settings = (("temperature", 0.0),)
+    assert _get_agent("test", settings) is _get_agent("test", settings)
+
+
+def test_get_agent_with_unhashable_settings():
+    settings = (("stop_sequences", ["\n\n"]), ("temperature", 0.0))
+    agent = _get_agent("test", settings)
+    assert agent.model_settings["stop_sequences"] == ["\n\n"]
+
+
+def test_stream_events_stops_early(monkeypatch):
+    """Test that the tasks end when the consumer stops with a full queue."""
+
+    async def get_all_events(text, **kwargs):
+        return text.upper()
+
+    monkeypatch.setattr(llm_utils, "get_all_events", get_all_events)
+    monkeypatch.setattr(llm_utils, "format_page_text_for_llm", lambda text: text)
+    pages = [SimpleNamespace(text=f"page {i}") for i in range(100)]
+
+    async def read_first_event():
+        events = llm_utils.stream_events(pages, concurrency=2, queue_size=1)
+        async for page, result in events:
+            break
+        await events.aclose()
+        pending_tasks = [task.get_coro().__name__ for task in asyncio.all_tasks()]
+        return result, pending_tasks
+
+    async def main():
+        return await asyncio.wait_for(read_first_event(), timeout=5)
+
+    result, pending_tasks = asyncio.run(main())
+    assert result.startswith("PAGE")
+    assert "read_pages" not in pending_tasks
+    assert "process_pages" not in pending_tasks
+
+
+def test_clean_infobox_value_only_caches_short_values():
+    llm_utils._clean_short_infobox_value.cache_clear()
+    assert llm_utils._clean_infobox_value("[[France]]") == "France"
+    long_value = "[[France]] " * 100
+    assert llm_utils._clean_infobox_value(long_value) == "France " * 100
+    assert llm_utils._clean_short_infobox_value.cache_info().currsize == 1
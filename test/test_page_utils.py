@@ -63,3 +63,31 @@ def test_extract_geospatial_coordinates_malformed():
 )
 def test_replace_file_links_with_captions(text, expected):
     assert page_utils.replace_file_links_with_captions(text) == expected
+
+
+def test_extract_infobox_category():
+    text = "{{Infobox Military Conflict <!-- comment -->\n| conflict = X\n}}"
+    assert page_utils.extract_infobox_category(text) == "military conflict"
+    assert page_utils.extract_infobox_category("No infobox here") is None
+
+
+def test_parse_infobox_with_nested_templates_and_single_braces():
+    """Test that the infobox ends at its own closing braces."""
+    page_text = (
+        "{{Infobox person\n"
+        "| name = Ada {{nowrap|Lovelace}}\n"
+        "| note = {a} {{efn|1}}\n"
+        "}}\n"
+        "Text after {{other}}."
+    )
+    infobox, infobox_text = page_utils.parse_infobox(page_text)
+    assert infobox_text == page_text[: page_text.index("\nText")]
+    assert infobox["name"] == "Ada {{nowrap|Lovelace}}"
+
+
+def test_split_infobox():
+    page_text = "Intro {{Infobox person\n| name = Ada\n}}\nText {{other}}."
+    infobox, text = page_utils.split_infobox(page_text)
+    assert infobox == {"category": "person", "name": "Ada"}
+    assert text == "Intro \nText {{other}}."
+    assert page_utils.split_infobox("No infobox") == ({}, "No infobox")